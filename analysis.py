@@ -0,0 +1,183 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+
+from catalog import SessionIndex, name_matches
+from plan import load_config, paradigm_paths, step_turns
+
+LOG_FOLDER = "logs"
+INDEX_NAME = "sessions.sqlite"
+
+PARADIGMS = {name: step_turns(load_config(path)) for name, path in paradigm_paths().items()}
+RESULTS = ["correct", "wrong", "miss", "pass"]
+RESULT_CODES = {result: code for code, result in enumerate(RESULTS)}
+PERCENTILES = [10, 25, 75, 90]
+
+COLUMNS = ["session", "turn", "elapse", "result", "step", "epoch"]
+SCORE_HEADERS = ["Paradigm", "Step", "Epoch", "Sessions", "Trials", "Hit", "FalseAlarm", "Miss", "Commission",
+                 "DPrime", "RTMean", "RTMedian"] + [f"RT{p}" for p in PERCENTILES]
+
+
+def session_files(folder, paradigm, participant=None, since=None):
+    paradigm_folder = os.path.join(folder, paradigm)
+    scanned = sorted(os.path.join(paradigm_folder, file) for file in os.listdir(paradigm_folder)
+                     if file.endswith(".csv")) if os.path.isdir(paradigm_folder) else []
+    indexed, known = [], set()
+    index_path = os.path.join(folder, INDEX_NAME)
+    if os.path.exists(index_path):
+        index = SessionIndex(index_path)
+        indexed = [session["csv_path"] for session in index.sessions(paradigm, participant, since)
+                   if session["csv_path"] and os.path.exists(session["csv_path"])]
+        known = {session["csv_path"] for session in index.sessions(paradigm) if session["csv_path"]}
+        index.close()
+    # Sessions written before the index existed are only on disk; their file names carry participant and start time.
+    return indexed + [path for path in scanned if os.path.abspath(path) not in known and
+                      name_matches(os.path.basename(path)[:-len(".csv")], participant, since)]
+
+
+def parse_session(path, steps, block_turns):
+    with open(path) as f:
+        return parse_lines(f, steps, block_turns)
+
+
+def parse_lines(lines, steps, block_turns):
+    elapses, results, step_codes = [], [], []
+    step_index = {step: code for code, step in enumerate(steps)}
+    lines = iter(lines)
+    next(lines, None)
+    for line in lines:
+        row = line.rstrip("\n").split(",")
+        if len(row) < 4 or not row[0].isdigit():
+            break
+        elapses.append(int(row[1]))
+        results.append(RESULT_CODES[row[2]])
+        step_codes.append(step_index[row[3]])
+    step_codes = np.array(step_codes, dtype=np.int8)
+    epochs = np.zeros(len(step_codes), dtype=np.int16)
+    for code in range(len(steps)):
+        mask = step_codes == code
+        epochs[mask] = np.arange(mask.sum()) // block_turns[code]
+    return np.array(elapses, dtype=np.int32), np.array(results, dtype=np.int8), step_codes, epochs
+
+
+def parse_chunk(args):
+    paths, steps, block_turns = args
+    return [parse_session(path, steps, block_turns) for path in paths]
+
+
+def load_sessions(paradigm, folder=LOG_FOLDER, workers=None, chunk_size=64, participant=None, since=None):
+    steps, block_turns = PARADIGMS[paradigm]
+    files = session_files(folder, paradigm, participant, since)
+    chunks = [(files[i: i + chunk_size], steps, block_turns) for i in range(0, len(files), chunk_size)]
+    if workers == 1 or len(chunks) <= 1:
+        parsed = [session for chunk in chunks for session in parse_chunk(chunk)]
+    else:
+        with ProcessPoolExecutor(workers) as executor:
+            parsed = [session for sessions in executor.map(parse_chunk, chunks) for session in sessions]
+
+    lengths = np.array([len(session[0]) for session in parsed], dtype=np.int64)
+    columns = {
+        "session": np.repeat(np.arange(len(parsed), dtype=np.int32), lengths),
+        "turn": np.concatenate([np.arange(1, n + 1, dtype=np.int32) for n in lengths]) if parsed else
+        np.zeros(0, dtype=np.int32),
+    }
+    for i, name in enumerate(["elapse", "result", "step", "epoch"]):
+        columns[name] = np.concatenate([session[i] for session in parsed]) if parsed else np.zeros(0, dtype=np.int8)
+    return files, columns
+
+
+def d_prime(hit_rate, false_alarm_rate):
+    z = NormalDist().inv_cdf
+    return np.array([z(h) - z(f) for h, f in zip(hit_rate, false_alarm_rate)])
+
+
+def rate_scores(counts):
+    correct, wrong, miss, passed = counts
+    targets = correct + miss
+    lures = wrong + passed
+    total = targets + lures
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = {
+            "Trials": total,
+            "Hit": np.where(targets > 0, correct / targets, 0.0),
+            "FalseAlarm": np.where(lures > 0, wrong / lures, 0.0),
+            "Miss": np.where(targets > 0, miss / targets, 0.0),
+            "Commission": np.where(total > 0, wrong / total, 0.0),
+        }
+    scores["DPrime"] = d_prime((correct + 0.5) / (targets + 1), (wrong + 0.5) / (lures + 1))
+    return scores
+
+
+def score(columns, by=("step", "epoch")):
+    keys = np.stack([columns[name].astype(np.int64) for name in by])
+    groups, group_index = np.unique(keys, axis=1, return_inverse=True)
+    group_index = group_index.reshape(-1)
+    group_count = groups.shape[1]
+
+    counts = np.zeros((len(RESULTS), group_count), dtype=np.int64)
+    np.add.at(counts, (columns["result"], group_index), 1)
+    scores = rate_scores(counts)
+    sessions = np.unique(np.stack([group_index, columns["session"]]), axis=1)[0]
+    scores["Sessions"] = np.bincount(sessions, minlength=group_count)
+
+    responded = (columns["result"] == RESULT_CODES["correct"]) | (columns["result"] == RESULT_CODES["wrong"])
+    rt_group = group_index[responded]
+    rt = columns["elapse"][responded].astype(np.float64)
+    order = np.lexsort((rt, rt_group))
+    rt_group, rt = rt_group[order], rt[order]
+    bounds = np.searchsorted(rt_group, np.arange(group_count + 1))
+    rt_count = np.diff(bounds)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores["RTMean"] = np.bincount(rt_group, weights=rt, minlength=group_count) / rt_count
+    for name, q in [("RTMedian", 50)] + [(f"RT{p}", p) for p in PERCENTILES]:
+        scores[name] = np.array([np.percentile(rt[bounds[i]: bounds[i + 1]], q) if rt_count[i] else np.nan
+                                 for i in range(group_count)])
+    return groups, scores
+
+
+def score_table(paradigm, groups, scores, by=("step", "epoch")):
+    steps, _ = PARADIGMS[paradigm]
+    rows = []
+    for i in range(groups.shape[1]):
+        key = dict(zip(by, groups[:, i]))
+        row = [paradigm, steps[key["step"]] if "step" in key else "", str(key.get("epoch", ""))]
+        for header in SCORE_HEADERS[3:]:
+            value = scores[header][i]
+            row.append(str(value) if isinstance(value, (int, np.integer)) else f"{value:.3f}")
+        rows.append(row)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score every session under the log folder")
+    parser.add_argument("folder", nargs="?", default=LOG_FOLDER)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--participant", default=None)
+    parser.add_argument("--since", default=None, help="only sessions started at or after this ISO time")
+    args = parser.parse_args()
+
+    rows = []
+    for paradigm in PARADIGMS:
+        if not os.path.exists(os.path.join(args.folder, paradigm)):
+            continue
+        files, columns = load_sessions(paradigm, args.folder, args.workers, participant=args.participant,
+                                       since=args.since)
+        if not files:
+            continue
+        rows += score_table(paradigm, *score(columns))
+
+    logs = "\n".join(",".join(row) for row in [SCORE_HEADERS] + rows)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(logs)
+    else:
+        print(logs)
+
+
+if __name__ == "__main__":
+    main()
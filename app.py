@@ -1,12 +1,46 @@
+import time
+
+START_TIME = time.perf_counter()
+
+import os
+import sys
+import threading
+
+from PySide6.QtCore import QTimer
 from PySide6.QtGui import QIcon
 from PySide6.QtWidgets import QApplication, QMainWindow, QStyleFactory, QVBoxLayout, QWidget, QTabWidget
-import sys
 
-from experiment_1 import Experiment1Widget
-from experiment_2 import Experiment2Widget
+from audio import AUDIO_BANK
+from batch import BatchRunner, load_roster
+
+TRACE_STARTUP = "--trace-startup" in sys.argv or bool(os.environ.get("PARADIGM_TRACE_STARTUP"))
+ROSTER = sys.argv[sys.argv.index("--roster") + 1] if "--roster" in sys.argv[:-1] else \
+    os.environ.get("PARADIGM_ROSTER")
+
+TABS = [
+    ("Go-no_go", "assets/paradigms/go_no_go.json"),
+    ("1_back-2_back", "assets/paradigms/n_back.json"),
+]
+
+
+def trace(label):
+    if TRACE_STARTUP:
+        print(f"[startup] {label}: {(time.perf_counter() - START_TIME) * 1000:.1f}ms", flush=True)
+
+
+def warm_up(paradigms):
+    from stimulus import STIMULUS_CACHE
+
+    for paradigm in paradigms:
+        for folder in paradigm.image_folders:
+            STIMULUS_CACHE.load(folder)
+        paradigm.recover_logs()
+        trace(f"warm {paradigm.name}")
 
 
 class MainWindow(QMainWindow):
+    is_painted = False
+
     def __init__(self):
         super().__init__()
 
@@ -28,27 +62,62 @@ class MainWindow(QMainWindow):
         layout.addWidget(self.tab_widget)
         layout.setStretchFactor(self.tab_widget, 1)
 
-        self.experiment_1_widget = Experiment1Widget()
-        self.tab_widget.addTab(self.experiment_1_widget, "Go-no_go")
-        self.experiment_2_widget = Experiment2Widget()
-        self.tab_widget.addTab(self.experiment_2_widget, "1_back-2_back")
+        self.paradigms = None
+        self.experiment_widgets = [None] * len(TABS)
+        for name, _ in TABS:
+            container = QWidget()
+            QVBoxLayout(container).setContentsMargins(0, 0, 0, 0)
+            self.tab_widget.addTab(container, name)
 
         self.tab_widget.tabBar().tabBarClicked.connect(self.tab_selected)
+        self.batch = BatchRunner(self, load_roster(ROSTER), TABS) if ROSTER else None
+        trace("main window")
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.is_painted:
+            self.is_painted = True
+            trace("first paint")
+            QTimer.singleShot(0, self.first_paint)
+
+    def load_paradigms(self):
+        if self.paradigms is None:
+            from paradigm import Paradigm
+
+            self.paradigms = [Paradigm(path) for _, path in TABS]
+        return self.paradigms
+
+    def first_paint(self):
+        paradigms = self.load_paradigms()
+        threading.Thread(target=warm_up, args=(paradigms,), name="warm-up", daemon=True).start()
+        AUDIO_BANK.load()
+        if self.batch:
+            self.batch.begin()
+        else:
+            self.experiment_widget(self.tab_widget.currentIndex()).prepare_practice_1()
+
+    def experiment_widget(self, index):
+        if self.experiment_widgets[index] is None:
+            from paradigm import ParadigmWidget
 
-        self.experiment_1_widget.prepare_practice_1()
+            name, _ = TABS[index]
+            widget = ParadigmWidget(self.load_paradigms()[index])
+            self.tab_widget.widget(index).layout().addWidget(widget)
+            self.experiment_widgets[index] = widget
+            trace(f"build {name}")
+        return self.experiment_widgets[index]
 
     def tab_selected(self, index):
-        if index == 0:
-            self.experiment_2_widget.media_player.stop()
-            self.experiment_1_widget.prepare_practice_1()
-        elif index == 1:
-            self.experiment_1_widget.media_player.stop()
-            self.experiment_2_widget.prepare_practice_1()
+        for i, widget in enumerate(self.experiment_widgets):
+            if widget is not None and i != index:
+                widget.stop_media()
+        self.experiment_widget(index).prepare_practice_1()
 
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     app.setStyle(QStyleFactory.create('Fusion'))
+    trace("application")
     window = MainWindow()
     window.show()
     sys.exit(app.exec())
@@ -0,0 +1,106 @@
+import os
+import statistics
+
+from PySide6.QtCore import QBuffer, QByteArray, QIODevice, QObject, QUrl, Signal
+
+from bundle import asset_bundle, key
+from timing import now
+
+MEDIA_FOLDER = "assets/media"
+
+
+class PcmEffect(QObject):
+    playingChanged = Signal()
+
+    def __init__(self, data, channels, rate, sample_width, volume):
+        super().__init__()
+        from PySide6.QtMultimedia import QAudio, QAudioFormat, QAudioSink
+
+        audio_format = QAudioFormat()
+        audio_format.setChannelCount(channels)
+        audio_format.setSampleRate(rate)
+        audio_format.setSampleFormat({1: QAudioFormat.SampleFormat.UInt8, 2: QAudioFormat.SampleFormat.Int16,
+                                      4: QAudioFormat.SampleFormat.Int32}[sample_width])
+        self.active = QAudio.State.ActiveState
+        self.sink = QAudioSink(audio_format, self)
+        self.sink.setVolume(volume)
+        self.sink.stateChanged.connect(self.playingChanged)
+        self.buffer = QBuffer(self)
+        self.buffer.setData(QByteArray(data.tobytes()))
+
+    def play(self):
+        self.buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+        self.buffer.seek(0)
+        self.sink.start(self.buffer)
+
+    def stop(self):
+        self.sink.stop()
+        self.buffer.close()
+
+    def isPlaying(self):
+        return self.sink.state() == self.active
+
+
+class AudioBank:
+    def __init__(self, volume=1.0, bundled=True):
+        self.volume = volume
+        self.bundled = bundled
+        self.effects = {}
+        self.latencies = {}
+
+        self.playing = None
+        self.play_time = 0
+
+    @property
+    def bundle(self):
+        return asset_bundle() if self.bundled else None
+
+    def load(self, folder=MEDIA_FOLDER):
+        from PySide6.QtMultimedia import QSoundEffect
+
+        bundled = self.bundle.paths(folder) if self.bundle and self.bundle.has_folder(folder) else []
+        files = sorted(os.listdir(folder)) if os.path.isdir(folder) else []
+        for path in dict.fromkeys(bundled + [key(os.path.join(folder, file)) for file in files]):
+            if not path.endswith(".wav") or path in self.effects:
+                continue
+            if self.bundle and path in self.bundle:
+                # Bundled audio is raw PCM, so it goes straight to a sink without a decoder in between.
+                effect = PcmEffect(*self.bundle.audio(path), self.volume)
+            else:
+                effect = QSoundEffect()
+                effect.setSource(QUrl.fromLocalFile(path))
+                effect.setVolume(self.volume)
+            effect.playingChanged.connect(lambda path=path: self.started(path))
+            self.effects[path] = effect
+
+    def play(self, path):
+        path = key(path)
+        if path not in self.effects:
+            self.load(os.path.dirname(path))
+        self.stop()
+        self.playing = path
+        self.play_time = now()
+        self.effects[path].play()
+
+    def stop(self):
+        if self.playing:
+            self.effects[self.playing].stop()
+            self.playing = None
+
+    def started(self, path):
+        if path == self.playing and self.play_time and self.effects[path].isPlaying():
+            self.latencies.setdefault(path, []).append((now() - self.play_time) / 1e6)
+            self.play_time = 0
+
+    @property
+    def report(self):
+        if not self.latencies:
+            return "audio start latency: none"
+        return "\n".join(
+            f"audio {os.path.basename(path)} start latency mean: {statistics.fmean(latencies):.3f} "
+            f"max: {max(latencies):.3f} count: {len(latencies)}"
+            for path, latencies in sorted(self.latencies.items())
+        )
+
+
+AUDIO_BANK = AudioBank()
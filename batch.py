@@ -0,0 +1,93 @@
+import datetime
+import os
+import time
+
+from PySide6.QtCore import QObject
+
+from writer import STATION
+
+BATCH_FOLDER = "logs"
+LEDGER_HEADERS = ["Participant", "Paradigm", "Session", "Finished", "Sessions", "SessionsPerHour"]
+
+
+def load_roster(path):
+    participants = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            participant = line.split(",")[0].strip()
+            if participant and not participant.startswith("#") and participant not in participants:
+                participants.append(participant)
+    return participants
+
+
+class BatchRunner(QObject):
+    def __init__(self, window, participants, tabs, folder=BATCH_FOLDER):
+        super().__init__(window)
+        self.window = window
+        self.participants = participants
+        self.tabs = tabs
+        self.ledger = os.path.join(folder, f"batch_{STATION}.csv")
+
+        self.index = 0
+        self.tab = 0
+        self.completed = 0
+        self.start_time = time.perf_counter()
+        self.connected = set()
+
+    @property
+    def participant(self):
+        return self.participants[self.index]
+
+    @property
+    def done(self):
+        return self.index >= len(self.participants)
+
+    @property
+    def rate(self):
+        hours = (time.perf_counter() - self.start_time) / 3600
+        return self.completed / hours if hours else 0.0
+
+    @property
+    def report(self):
+        return f"station {STATION}: {self.completed} sessions, {self.rate:.1f} sessions/h"
+
+    def begin(self):
+        self.start_time = time.perf_counter()
+        if self.participants:
+            self.run()
+        else:
+            self.window.statusBar().showMessage("roster is empty")
+
+    def run(self):
+        widget = self.window.experiment_widget(self.tab)
+        if self.tab not in self.connected:
+            widget.finished.connect(lambda session, tab=self.tab: self.finished(tab, session))
+            self.connected.add(self.tab)
+        widget.participant = self.participant
+        self.window.tab_widget.setCurrentIndex(self.tab)
+        self.window.tab_selected(self.tab)
+        self.window.statusBar().showMessage(
+            f"{self.participant} ({self.index + 1}/{len(self.participants)}) {self.tabs[self.tab][0]} | {self.report}")
+
+    def finished(self, tab, session):
+        if self.done or tab != self.tab:
+            return
+        self.completed += 1
+        self.write(session)
+        self.tab += 1
+        if self.tab == len(self.tabs):
+            self.tab = 0
+            self.index += 1
+        if self.done:
+            self.window.statusBar().showMessage(f"roster finished | {self.report}")
+        else:
+            self.run()
+
+    def write(self, session):
+        os.makedirs(os.path.dirname(self.ledger), exist_ok=True)
+        is_new = not os.path.exists(self.ledger)
+        with open(self.ledger, "a", encoding="utf-8") as f:
+            if is_new:
+                f.write(",".join(LEDGER_HEADERS) + "\n")
+            f.write(f"{self.participant},{self.tabs[self.tab][0]},{session},"
+                    f"{datetime.datetime.now().strftime('%Y-%m-%d-%H-%M-%S')},{self.completed},{self.rate:.1f}\n")
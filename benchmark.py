@@ -0,0 +1,269 @@
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QEvent, QEventLoop, Qt
+from PySide6.QtGui import QKeyEvent
+from PySide6.QtWidgets import QApplication
+
+import timing
+from paradigm import Paradigm, ParadigmWidget
+from plan import paradigm_paths
+from scheduler import DeadlineScheduler, FrameScheduler
+
+RESPONDERS = {
+    "perfect": lambda rng, target: 400 if target else None,
+    "random": lambda rng, target: rng.randint(150, 700) if rng.random() < 0.5 else None,
+    "fixed": lambda rng, target: 300,
+    "lapse": lambda rng, target: (None if rng.random() < 0.2 else max(150, rng.gauss(450, 80))) if target else
+    (rng.randint(200, 600) if rng.random() < 0.1 else None),
+}
+MAX_STEPS = 100000
+
+
+class VirtualClock:
+    def __init__(self):
+        self.offset = 0
+
+    def now(self):
+        return time.perf_counter_ns() + self.offset
+
+    def advance(self, timestamp):
+        current = self.now()
+        if timestamp > current:
+            self.offset += timestamp - current
+
+
+class VirtualScheduler(DeadlineScheduler):
+    block_count = 0
+    fired_at = 0
+
+    def start(self):
+        super().start()
+        self.block_count += 1
+        self.fired_at = self.origin
+
+    def after(self, delay, callback):
+        self.deadline += delay * 1_000_000
+        self.callback = callback
+
+    @property
+    def pending(self):
+        return self.origin + self.deadline if self.callback else None
+
+    def fire(self):
+        callback, self.callback = self.callback, None
+        self.fired_at = self.origin + self.deadline
+        callback()
+
+
+class Trial:
+    def __init__(self, summary, index, target, response, planned):
+        self.summary = summary
+        self.index = index
+        self.target = target
+        self.response = response
+        self.planned = planned
+
+    @property
+    def expected(self):
+        if self.target:
+            return "correct" if self.response is not None else "miss"
+        return "wrong" if self.response is not None else "pass"
+
+
+class Harness:
+    onset_relative = False
+
+    def __init__(self, paradigm, responder, seed=0):
+        self.paradigm = paradigm
+        self.responder = responder
+        self.response_window = paradigm.timing["show"] - 1
+        self.rng = random.Random(seed)
+        random.seed(seed)
+
+        self.clock = VirtualClock()
+        timing.clock = self.clock.now
+        self.paradigm.log_folder = os.path.join(tempfile.mkdtemp(), self.paradigm.name)
+
+        self.widget = ParadigmWidget(self.paradigm)
+        self.widget.resize(960, 640)
+        self.widget.scheduler = VirtualScheduler(self.widget, clock=timing.now)
+        self.widget.display.painted.connect(self.on_paint)
+        self.widget.show()
+        self.widget.activateWindow()
+
+        self.trials = []
+        self.history = []
+        self.block_count = 0
+        self.press_at = None
+        self.updates = []
+
+    @property
+    def rule(self):
+        return self.paradigm.config["steps"][self.widget.step]["rule"]
+
+    def stimulus(self):
+        return self.widget.current_sound if self.rule.get("respond") == "auditory" else self.widget.current_image
+
+    def is_target(self, image):
+        rule = self.rule
+        if rule["kind"] == "set":
+            return image in rule["targets"]
+        back = rule["back"]
+        return len(self.history) >= back and self.history[-back] == image
+
+    def on_paint(self, onset_time):
+        if not self.widget.is_start:
+            return
+        scheduler = self.widget.scheduler
+        if scheduler.block_count != self.block_count:
+            self.block_count = scheduler.block_count
+            self.history = []
+        image = self.stimulus()
+        target = self.is_target(image)
+        self.history.append(image)
+
+        response = self.responder(self.rng, target)
+        if response is not None:
+            response = min(response, self.response_window)
+            anchor = onset_time if self.onset_relative else scheduler.fired_at
+            self.press_at = anchor + round(response * 1_000_000)
+        summary = self.widget.summary
+        self.trials.append(Trial(summary, summary.total - 1, target, response, scheduler.fired_at))
+
+    def step(self):
+        start_time = time.perf_counter_ns()
+        pending = self.widget.scheduler.pending
+        if self.press_at is not None and (pending is None or self.press_at <= pending):
+            self.clock.advance(self.press_at)
+            self.press_at = None
+            # A synthetic key event carries no timestamp, so the input layer stamps it on receipt.
+            for kind in (QEvent.Type.KeyPress, QEvent.Type.KeyRelease):
+                QApplication.sendEvent(self.widget, QKeyEvent(kind, Qt.Key.Key_Space, Qt.KeyboardModifier.NoModifier))
+        elif pending is not None:
+            self.clock.advance(pending)
+            self.widget.scheduler.fire()
+        else:
+            self.widget.button.click()
+        QApplication.processEvents()
+        self.updates.append((time.perf_counter_ns() - start_time) / 1e6)
+
+    def run(self):
+        self.widget.prepare_practice_1()
+        QApplication.processEvents()
+        start_time = time.perf_counter()
+        virtual_start = self.clock.now()
+        for _ in range(MAX_STEPS):
+            if not self.widget.table.isHidden():
+                break
+            self.step()
+        else:
+            raise RuntimeError("session did not finish")
+        return time.perf_counter() - start_time, (self.clock.now() - virtual_start) / 1e9
+
+    def report(self):
+        wall_time, virtual_time = self.run()
+        lateness, rt_error, mismatch = [], [], 0
+        for trial in self.trials:
+            elapse, result, step, onset, response = trial.summary.records[trial.index][:5]
+            lateness.append((onset - trial.planned) / 1e6)
+            if result != trial.expected:
+                mismatch += 1
+            elif response and trial.response is not None:
+                rt_error.append((response - onset) / 1e6 - trial.response)
+        self.widget.close()
+        self.widget.deleteLater()
+        return {
+            "trials": len(self.trials),
+            "wall": wall_time,
+            "virtual": virtual_time,
+            "lateness_mean": statistics.fmean(lateness),
+            "lateness_max": max(lateness),
+            "rt_error_mean": statistics.fmean(rt_error) if rt_error else 0.0,
+            "rt_error_max": max(map(abs, rt_error)) if rt_error else 0.0,
+            "scoring": 1 - mismatch / len(self.trials),
+            "update_mean": statistics.fmean(self.updates),
+            "update_p99": statistics.quantiles(self.updates, n=100)[98],
+        }
+
+
+def frame_check(path, flips):
+    paradigm = Paradigm(path)
+    widget = ParadigmWidget(paradigm)
+    widget.resize(960, 640)
+    widget.show()
+    widget.prepare_practice_1()
+    QApplication.processEvents()
+    widget.generation.result()
+    images = [trial[0] for trial in widget.block.trials]
+    scheduler = FrameScheduler(widget)
+    durations = [paradigm.timing["show"] if i % 2 == 0 else paradigm.timing["pause"] for i in range(flips)]
+    loop = QEventLoop()
+
+    def flip(i=0):
+        if i % 2:
+            widget.display.clear()
+        else:
+            widget.set_image(images[i // 2 % len(images)])
+        if i < flips:
+            scheduler.after(durations[i], lambda: flip(i + 1))
+        else:
+            loop.quit()
+
+    scheduler.start()
+    flip()
+    loop.exec()
+    scheduler.stop()
+    frames, dropped = scheduler.take_frames()
+    widget.close()
+    widget.deleteLater()
+
+    planned = [sum(scheduler.frames(d) for d in durations[:i + 1]) for i in range(flips)]
+    frame_error = [frame - plan for (frame, _), plan in zip(frames, planned)]
+    first_frame = scheduler.frame_time - scheduler.origin
+    time_error = [(flip_time - first_frame - frame * scheduler.period) / 1e6 for frame, flip_time in frames]
+    return {
+        "flips": len(frames),
+        "period": scheduler.period / 1e6,
+        "frame_error_max": max(map(abs, frame_error)),
+        "time_error_mean": statistics.fmean(time_error),
+        "time_error_max": max(map(abs, time_error)),
+        "dropped": dropped,
+    }
+
+
+FRAME_TEMPLATE = ("{paradigm} frames: {flips} flips at {period:.3f}ms, frame error max {frame_error_max}, "
+                  "flip time error mean {time_error_mean:.3f}ms max {time_error_max:.3f}ms, dropped {dropped}")
+REPORT_TEMPLATE = ("{paradigm} {responder}: {trials} trials in {wall:.3f}s (virtual {virtual:.0f}s), "
+                   "onset lateness mean {lateness_mean:.3f}ms max {lateness_max:.3f}ms, "
+                   "rt error mean {rt_error_mean:.3f}ms max {rt_error_max:.3f}ms, "
+                   "update mean {update_mean:.3f}ms p99 {update_p99:.3f}ms, scoring {scoring:.1%}")
+PARADIGMS = paradigm_paths()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run both paradigms headless against scripted responders")
+    parser.add_argument("--paradigm", choices=list(PARADIGMS), action="append")
+    parser.add_argument("--responder", choices=list(RESPONDERS), action="append")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--frames", type=int, default=0, help="also check frame-counted flips in real time")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])  # noqa: F841
+    for paradigm in args.paradigm or PARADIGMS if args.frames else []:
+        print(FRAME_TEMPLATE.format(paradigm=paradigm, **frame_check(PARADIGMS[paradigm], args.frames)))
+    for paradigm in args.paradigm or PARADIGMS:
+        for responder in args.responder or RESPONDERS:
+            result = Harness(Paradigm(PARADIGMS[paradigm]), RESPONDERS[responder], args.seed).report()
+            print(REPORT_TEMPLATE.format(paradigm=paradigm, responder=responder, **result))
+    timing.clock = time.perf_counter_ns
+
+
+if __name__ == "__main__":
+    main()
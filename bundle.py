@@ -0,0 +1,211 @@
+import argparse
+import glob
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import wave
+
+from PySide6.QtGui import QImage, Qt
+
+from plan import load_config
+
+BUNDLE_PATH = os.environ.get("PARADIGM_BUNDLE", "assets/stimuli.bundle")
+PARADIGM_FOLDER = "assets/paradigms"
+MEDIA_FOLDER = "assets/media"
+MAGIC = b"PDGMBNDL"
+VERSION = 1
+HEADER = struct.Struct("<8sII")
+ALIGNMENT = 64
+STANDARD_HEIGHTS = [360, 540, 720, 1080, 1440]
+IMAGE_FORMAT = QImage.Format.Format_ARGB32_Premultiplied
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".bmp")
+AUDIO_SUFFIXES = (".wav",)
+BUNDLE_LOCK = threading.Lock()
+BUNDLES = {}
+
+
+def key(path):
+    return os.path.normpath(path).replace(os.sep, "/")
+
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def set_digest(entries):
+    digest = hashlib.sha256()
+    for path in sorted(entries):
+        digest.update(f"{path}\0{entries[path]['sha256']}\n".encode())
+    return digest.hexdigest()
+
+
+def default_folders():
+    folders = []
+    for path in sorted(glob.glob(os.path.join(PARADIGM_FOLDER, "*.json"))):
+        folders += [step["images"] for step in load_config(path)["steps"].values()]
+    return list(dict.fromkeys(folders + [MEDIA_FOLDER]))
+
+
+def image_levels(path):
+    image = QImage(path)
+    if image.isNull():
+        raise ValueError(f"cannot decode {path}")
+    image = image.convertToFormat(IMAGE_FORMAT)
+    levels = [image.scaledToHeight(height, Qt.TransformationMode.SmoothTransformation).convertToFormat(IMAGE_FORMAT)
+              for height in STANDARD_HEIGHTS if height < image.height()]
+    return levels + [image]
+
+
+def build(folders, output=BUNDLE_PATH):
+    entries, payloads, offset = {}, [], 0
+
+    def add(data):
+        nonlocal offset
+        start = offset
+        payloads.append((start, data))
+        offset += len(data) + -len(data) % ALIGNMENT
+        return {"offset": start, "length": len(data), "data_sha256": hashlib.sha256(data).hexdigest()}
+
+    for folder in folders:
+        for file in sorted(os.listdir(folder)):
+            path = os.path.join(folder, file)
+            if file.lower().endswith(IMAGE_SUFFIXES):
+                levels = [{"width": image.width(), "height": image.height(), "stride": image.bytesPerLine(),
+                           **add(bytes(image.constBits()))} for image in image_levels(path)]
+                entries[key(path)] = {"kind": "image", "sha256": file_hash(path), "levels": levels}
+            elif file.lower().endswith(AUDIO_SUFFIXES):
+                try:
+                    audio = wave.open(path, "rb")
+                except (EOFError, wave.Error) as e:
+                    # Left out of the bundle; the audio bank falls back to decoding the file itself.
+                    print(f"skipped {path}: {str(e) or 'empty file'}", file=sys.stderr)
+                    continue
+                with audio:
+                    frames = audio.readframes(audio.getnframes())
+                    entries[key(path)] = {"kind": "audio", "sha256": file_hash(path),
+                                          "channels": audio.getnchannels(), "rate": audio.getframerate(),
+                                          "sample_width": audio.getsampwidth(), **add(frames)}
+
+    folder_entries = {}
+    for path, entry in entries.items():
+        folder_entries.setdefault(os.path.dirname(path), {})[path] = entry
+    index = json.dumps({
+        "version": VERSION,
+        "digest": set_digest(entries),
+        "folders": {folder: set_digest(items) for folder, items in sorted(folder_entries.items())},
+        "entries": entries,
+    }, ensure_ascii=False).encode()
+    # Payload offsets are relative to the aligned data start, which follows the index.
+    data_start = HEADER.size + len(index) + -(HEADER.size + len(index)) % ALIGNMENT
+    with open(output + ".partial", "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(index)))
+        f.write(index)
+        for start, data in payloads:
+            f.seek(data_start + start)
+            f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(output + ".partial", output)
+    return json.loads(index)
+
+
+class AssetBundle:
+    def __init__(self, path=BUNDLE_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, length = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} asset bundle")
+        self.index = json.loads(self.data[HEADER.size:HEADER.size + length])
+        self.entries = self.index["entries"]
+        self.data_start = HEADER.size + length + -(HEADER.size + length) % ALIGNMENT
+        self.view = memoryview(self.data)
+
+    def close(self):
+        self.view.release()
+        self.data.close()
+
+    def __contains__(self, path):
+        return key(path) in self.entries
+
+    @property
+    def digest(self):
+        return self.index["digest"]
+
+    def has_folder(self, folder):
+        return key(folder) in self.index["folders"]
+
+    def paths(self, folder):
+        folder = key(folder)
+        return [path for path in self.entries if os.path.dirname(path) == folder]
+
+    def payload(self, entry):
+        start = self.data_start + entry["offset"]
+        return self.view[start:start + entry["length"]]
+
+    def image(self, path, height=None):
+        levels = self.entries[key(path)]["levels"]
+        level = next((level for level in levels if height and level["height"] >= height), levels[-1])
+        # The QImage points straight into the mapping; it stays valid for as long as the bundle is open.
+        return QImage(self.payload(level), level["width"], level["height"], level["stride"], IMAGE_FORMAT)
+
+    def audio(self, path):
+        entry = self.entries[key(path)]
+        return self.payload(entry), entry["channels"], entry["rate"], entry["sample_width"]
+
+    def verify(self):
+        damaged = []
+        for path, entry in self.entries.items():
+            for part in entry.get("levels", [entry]):
+                if hashlib.sha256(self.payload(part)).hexdigest() != part["data_sha256"]:
+                    damaged.append(path)
+                    break
+        return damaged
+
+    def stale(self):
+        return [path for path, entry in self.entries.items()
+                if not os.path.exists(path) or file_hash(path) != entry["sha256"]]
+
+
+def load_bundle(path=BUNDLE_PATH):
+    return AssetBundle(path) if os.path.exists(path) else None
+
+
+def asset_bundle(path=BUNDLE_PATH):
+    # Mapped on first use instead of at import, so startup does no bundle I/O before the first paint.
+    if path not in BUNDLES:
+        with BUNDLE_LOCK:
+            if path not in BUNDLES:
+                BUNDLES[path] = load_bundle(path)
+    return BUNDLES[path]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack stimulus images and audio into one memory-mappable bundle")
+    parser.add_argument("folders", nargs="*", help="folders to pack (default: every paradigm folder and media)")
+    parser.add_argument("--output", default=BUNDLE_PATH)
+    parser.add_argument("--verify", action="store_true", help="check an existing bundle instead of building one")
+    args = parser.parse_args()
+
+    if args.verify:
+        bundle = AssetBundle(args.output)
+        damaged, stale = bundle.verify(), bundle.stale()
+        for path in damaged:
+            print(f"damaged: {path}")
+        for path in stale:
+            print(f"stale: {path}")
+        print(f"{args.output}: {len(bundle.entries)} assets, digest {bundle.digest}")
+        raise SystemExit(1 if damaged else 0)
+
+    index = build(args.folders or default_folders(), args.output)
+    print(f"{args.output}: {len(index['entries'])} assets, digest {index['digest']}")
+
+
+if __name__ == "__main__":
+    main()
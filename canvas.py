@@ -0,0 +1,69 @@
+from PySide6.QtCore import QPoint, QRect, Qt, Signal
+from PySide6.QtGui import QPainter
+from PySide6.QtWidgets import QWidget
+
+from timing import now
+
+TEXT_FLAGS = Qt.AlignmentFlag.AlignCenter | Qt.TextFlag.TextWordWrap
+
+
+class StimulusCanvas(QWidget):
+    painted = Signal(object)
+
+    def __init__(self):
+        super().__init__()
+        self.pix_map = None
+        self.text = ""
+        self.feedback = None
+        self.content = QRect()
+        self.pending = False
+        # Every paint fills its region itself, so Qt can skip painting the parent underneath.
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+
+    def content_rect(self):
+        if self.pix_map is not None:
+            rect = QRect(QPoint(), self.pix_map.deviceIndependentSize().toSize())
+            rect.moveCenter(self.rect().center())
+            return rect
+        if self.text:
+            return self.fontMetrics().boundingRect(self.rect(), TEXT_FLAGS, self.text)
+        return QRect()
+
+    def replace(self, pix_map, text):
+        previous = self.content
+        self.pix_map = pix_map
+        self.text = text
+        self.content = self.content_rect()
+        self.update(previous.united(self.content))
+
+    def set_pixmap(self, pix_map):
+        self.pending = True
+        self.replace(pix_map, "")
+
+    def set_text(self, text):
+        self.replace(None, text)
+
+    def clear(self):
+        self.replace(None, "")
+
+    def set_feedback(self, color):
+        if color != self.feedback:
+            self.feedback = color
+            self.update()
+
+    def resizeEvent(self, event):
+        self.content = self.content_rect()
+        super().resizeEvent(event)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(event.rect(), self.feedback or self.palette().window())
+        if self.pix_map is not None:
+            painter.drawPixmap(self.content.topLeft(), self.pix_map)
+        elif self.text:
+            painter.setFont(self.font())
+            painter.drawText(self.rect(), TEXT_FLAGS, self.text)
+        painter.end()
+        if self.pending:
+            self.pending = False
+            self.painted.emit(now())
@@ -0,0 +1,171 @@
+import argparse
+import datetime
+import os
+import sqlite3
+
+from writer import read_rows, session_participant, session_station, RECOVERED_SUFFIX
+
+INDEX_PATH = "logs/sessions.sqlite"
+FIELDS = {
+    "session": "TEXT PRIMARY KEY",
+    "participant": "TEXT",
+    "paradigm": "TEXT",
+    "station": "TEXT",
+    "status": "TEXT",
+    "start_time": "TEXT",
+    "end_time": "TEXT",
+    "trials": "INTEGER",
+    "correct": "INTEGER",
+    "wrong": "INTEGER",
+    "miss": "INTEGER",
+    "pass": "INTEGER",
+    "hit_rate": "REAL",
+    "false_alarm_rate": "REAL",
+    "rt_mean": "REAL",
+    "rt_sd": "REAL",
+    "dropped_frames": "INTEGER",
+    "csv_path": "TEXT",
+    "data_path": "TEXT",
+    "seed": "INTEGER",
+}
+PATH_FIELDS = ["csv_path", "data_path"]
+PATH_VERSION = 1
+INDEXES = {
+    "sessions_participant": ("participant", "paradigm"),
+    "sessions_paradigm": ("paradigm", "start_time"),
+}
+
+
+class SessionIndex:
+    def __init__(self, path=INDEX_PATH):
+        self.path = path
+        # Paths are stored relative to the index so a copied or moved log folder still resolves.
+        self.root = os.path.dirname(os.path.abspath(path))
+        os.makedirs(self.root, exist_ok=True)
+        # Stations sharing a folder take turns on the database lock instead of failing.
+        self.connection = sqlite3.connect(path, timeout=30)
+        fields = ", ".join(f'"{name}" {kind}' for name, kind in FIELDS.items())
+        with self.connection:
+            self.connection.execute(f"CREATE TABLE IF NOT EXISTS sessions ({fields})")
+            existing = {row[1] for row in self.connection.execute("PRAGMA table_info(sessions)")}
+            for name, kind in FIELDS.items():
+                if name not in existing:
+                    self.connection.execute(f'ALTER TABLE sessions ADD COLUMN "{name}" {kind}')
+            for name, columns in INDEXES.items():
+                self.connection.execute(f"CREATE INDEX IF NOT EXISTS {name} ON sessions ({', '.join(columns)})")
+            if self.connection.execute("PRAGMA user_version").fetchone()[0] < PATH_VERSION:
+                # Older indexes hold paths relative to the working directory they were written from.
+                for column in PATH_FIELDS:
+                    rows = self.connection.execute(f'SELECT session, "{column}" FROM sessions WHERE "{column}" '
+                                                   "IS NOT NULL").fetchall()
+                    self.connection.executemany(f'UPDATE sessions SET "{column}" = ? WHERE session = ?',
+                                                [(self.relative(value), session) for session, value in rows])
+                self.connection.execute(f"PRAGMA user_version = {PATH_VERSION}")
+
+    def close(self):
+        self.connection.close()
+
+    def relative(self, path):
+        try:
+            return os.path.relpath(os.path.abspath(path), self.root)
+        except ValueError:
+            return os.path.abspath(path)
+
+    def resolve(self, path):
+        return os.path.normpath(os.path.join(self.root, path))
+
+    def register(self, metadata):
+        row = {name: metadata.get(name) for name in FIELDS}
+        for name in PATH_FIELDS:
+            if row[name]:
+                row[name] = self.relative(row[name])
+        names = ", ".join(f'"{name}"' for name in row)
+        with self.connection:
+            self.connection.execute(f"INSERT OR REPLACE INTO sessions ({names}) VALUES ({', '.join('?' * len(row))})",
+                                    list(row.values()))
+
+    def sessions(self, paradigm=None, participant=None, since=None, until=None):
+        clauses, values = [], []
+        for column, operator, value in [("paradigm", "=", paradigm), ("participant", "=", participant),
+                                        ("start_time", ">=", since), ("start_time", "<", until)]:
+            if value is not None:
+                clauses.append(f"{column} {operator} ?")
+                values.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        cursor = self.connection.execute(f"SELECT * FROM sessions{where} ORDER BY start_time, session", values)
+        names = [description[0] for description in cursor.description]
+        sessions = [dict(zip(names, row)) for row in cursor]
+        for session in sessions:
+            for name in PATH_FIELDS:
+                if session[name]:
+                    session[name] = self.resolve(session[name])
+        return sessions
+
+
+def name_time(name):
+    timestamp = name if session_station(name) is None else name.split("_")[1]
+    try:
+        return datetime.datetime.strptime(timestamp, "%Y-%m-%d-%H-%M-%S").isoformat(timespec="milliseconds")
+    except ValueError:
+        return None
+
+
+def name_matches(name, participant=None, since=None):
+    name = name.removesuffix(RECOVERED_SUFFIX)
+    start_time = name_time(name)
+    return ((participant is None or session_participant(name) == participant) and
+            (since is None or start_time is not None and start_time >= since))
+
+
+def import_folder(index, folder):
+    known = {session["csv_path"] for session in index.sessions()}
+    imported = []
+    for paradigm in sorted(os.listdir(folder)):
+        if not os.path.isdir(os.path.join(folder, paradigm)):
+            continue
+        for file in sorted(os.listdir(os.path.join(folder, paradigm))):
+            path = os.path.join(folder, paradigm, file)
+            if not file.endswith(".csv") or os.path.abspath(path) in known:
+                continue
+            name = file[:-len(".csv")].removesuffix(RECOVERED_SUFFIX)
+            results = [row[2] for row in read_rows(path)]
+            index.register({
+                "session": name, "participant": session_participant(name), "paradigm": paradigm,
+                "station": session_station(name), "status": "imported", "trials": len(results),
+                "start_time": name_time(name),
+                "csv_path": path, **{result: results.count(result) for result in ("correct", "wrong", "miss", "pass")},
+            })
+            imported.append(path)
+    return imported
+
+
+def register(metadata, path=INDEX_PATH):
+    index = SessionIndex(path)
+    try:
+        index.register(metadata)
+    finally:
+        index.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List sessions from the session index")
+    parser.add_argument("--index", default=INDEX_PATH)
+    parser.add_argument("--paradigm")
+    parser.add_argument("--participant")
+    parser.add_argument("--since")
+    parser.add_argument("--import-folder", help="register session CSVs written before the index existed")
+    args = parser.parse_args()
+
+    index = SessionIndex(args.index)
+    if args.import_folder:
+        import_folder(index, args.import_folder)
+    columns = ["session", "participant", "paradigm", "status", "start_time", "trials", "hit_rate",
+               "false_alarm_rate", "rt_mean"]
+    print(",".join(columns))
+    for session in index.sessions(args.paradigm, args.participant, args.since):
+        print(",".join("" if session[column] is None else str(session[column]) for column in columns))
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from analysis import LOG_FOLDER, PARADIGMS, PERCENTILES, RESULT_CODES, RESULTS, SCORE_HEADERS, parse_lines, \
+    rate_scores, score_table
+
+CACHE_NAME = "cohort.sqlite"
+VERSION = 1
+CHUNK_SIZE = 64
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value TEXT)",
+    "CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, paradigm TEXT, size INTEGER, mtime_ns INTEGER, "
+    "sha256 TEXT)",
+    'CREATE TABLE IF NOT EXISTS session_rows (path TEXT, step TEXT, epoch INTEGER, correct INTEGER, wrong INTEGER, '
+    'miss INTEGER, "pass" INTEGER, rt BLOB, PRIMARY KEY (path, step, epoch))',
+    'CREATE TABLE IF NOT EXISTS cohort (paradigm TEXT, step TEXT, epoch INTEGER, sessions INTEGER, correct INTEGER, '
+    'wrong INTEGER, miss INTEGER, "pass" INTEGER, rt BLOB, PRIMARY KEY (paradigm, step, epoch))',
+]
+
+
+def pack_rt(values, counts):
+    return np.stack([values, counts]).astype(np.int64).tobytes()
+
+
+def unpack_rt(blob):
+    return np.frombuffer(blob, dtype=np.int64).reshape(2, -1)
+
+
+def merge_rt(blobs, signs):
+    # Reaction times are whole milliseconds, so a (value, count) histogram merges exactly and keeps percentiles exact.
+    parts = [unpack_rt(blob) * [[1], [sign]] for blob, sign in zip(blobs, signs) if blob]
+    if not parts:
+        return pack_rt([], [])
+    keys, inverse = np.unique(np.concatenate([values for values, _ in parts]), return_inverse=True)
+    totals = np.bincount(inverse, weights=np.concatenate([counts for _, counts in parts]),
+                         minlength=len(keys)).astype(np.int64)
+    return pack_rt(keys[totals > 0], totals[totals > 0])
+
+
+def rt_percentile(values, counts, q):
+    # Same order statistics and interpolation as np.percentile over the expanded values.
+    index = q / 100 * (counts.sum() - 1)
+    bounds = np.cumsum(counts)
+    low, high = values[np.searchsorted(bounds, [np.floor(index), np.ceil(index)], side="right")].astype(np.float64)
+    t = index - np.floor(index)
+    return low + (high - low) * t if t < 0.5 else high - (high - low) * (1 - t)
+
+
+def summarise_session(path, steps, block_turns, known=None):
+    with open(path, "rb") as f:
+        content = f.read()
+    digest = hashlib.sha256(content).hexdigest()
+    if digest == known:
+        return digest, None
+    elapses, results, step_codes, epochs = parse_lines(content.decode().splitlines(), steps, block_turns)
+    responded = (results == RESULT_CODES["correct"]) | (results == RESULT_CODES["wrong"])
+    rows = []
+    for code, epoch in sorted(set(zip(step_codes.tolist(), epochs.tolist()))):
+        mask = (step_codes == code) & (epochs == epoch)
+        counts = np.bincount(results[mask], minlength=len(RESULTS)).tolist()
+        rt = pack_rt(*np.unique(elapses[mask & responded], return_counts=True))
+        rows.append((steps[code], epoch, *counts, rt))
+    return digest, rows
+
+
+def summarise_chunk(args):
+    files, steps, block_turns = args
+    return [(path, *summarise_session(path, steps, block_turns, known)) for path, known in files]
+
+
+class CohortCache:
+    def __init__(self, path):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path, timeout=30)
+        settings = json.dumps({"version": VERSION, "paradigms": PARADIGMS}, sort_keys=True)
+        with self.connection:
+            for statement in SCHEMA:
+                self.connection.execute(statement)
+            row = self.connection.execute("SELECT value FROM settings WHERE name = 'paradigms'").fetchone()
+            if row is None or row[0] != settings:
+                # Epochs and step codes depend on the paradigm table, so cached rows from another layout are useless.
+                self.clear()
+                self.connection.execute("INSERT OR REPLACE INTO settings VALUES ('paradigms', ?)", (settings,))
+
+    def close(self):
+        self.connection.close()
+
+    def clear(self):
+        for table in ("files", "session_rows", "cohort"):
+            self.connection.execute(f"DELETE FROM {table}")
+
+    def manifest(self):
+        return {path: (paradigm, size, mtime_ns, sha256) for path, paradigm, size, mtime_ns, sha256
+                in self.connection.execute("SELECT path, paradigm, size, mtime_ns, sha256 FROM files")}
+
+    def groups(self):
+        return {(paradigm, step, epoch): [sessions, correct, wrong, miss, passed, rt]
+                for paradigm, step, epoch, sessions, correct, wrong, miss, passed, rt
+                in self.connection.execute("SELECT * FROM cohort")}
+
+    def scan(self, folder):
+        # Only a stat per file; unchanged sessions are never opened.
+        files = {}
+        for paradigm in PARADIGMS:
+            paradigm_folder = os.path.join(folder, paradigm)
+            if not os.path.isdir(paradigm_folder):
+                continue
+            with os.scandir(paradigm_folder) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".csv") and entry.is_file():
+                        stat = entry.stat()
+                        files[entry.path] = paradigm, stat.st_size, stat.st_mtime_ns
+        return files
+
+    def summarise(self, pending, workers=None):
+        chunks = [(files[i: i + CHUNK_SIZE], *PARADIGMS[paradigm]) for paradigm, files in pending.items()
+                  for i in range(0, len(files), CHUNK_SIZE)]
+        if workers == 1 or len(chunks) <= 1:
+            return [session for chunk in chunks for session in summarise_chunk(chunk)]
+        with ProcessPoolExecutor(workers) as executor:
+            return [session for sessions in executor.map(summarise_chunk, chunks) for session in sessions]
+
+    def merge(self, groups, paradigm, rows, sign):
+        # Histograms are only collected here; refresh merges each group's in one pass once every session is in.
+        for step, epoch, *counts, rt in rows:
+            group = groups.setdefault((paradigm, step, epoch), [0, 0, 0, 0, 0, None])
+            group[0] += sign
+            for i, count in enumerate(counts):
+                group[i + 1] += sign * count
+            if not isinstance(group[5], list):
+                group[5] = [(group[5], 1)]
+            group[5].append((rt, sign))
+
+    def forget(self, groups, path, paradigm):
+        rows = self.connection.execute('SELECT step, epoch, correct, wrong, miss, "pass", rt FROM session_rows '
+                                       "WHERE path = ?", (path,)).fetchall()
+        self.merge(groups, paradigm, rows, -1)
+        self.connection.execute("DELETE FROM session_rows WHERE path = ?", (path,))
+
+    def refresh(self, folder=LOG_FOLDER, workers=None):
+        manifest, files = self.manifest(), self.scan(folder)
+        pending = {}
+        for path, (paradigm, size, mtime_ns) in files.items():
+            known = manifest.get(path)
+            if known is None or known[0] != paradigm or known[1:3] != (size, mtime_ns):
+                pending.setdefault(paradigm, []).append((path, known[3] if known else None))
+        removed = [path for path in manifest if path not in files]
+        summaries = self.summarise(pending, workers)
+
+        report = {"new": 0, "changed": 0, "touched": 0, "removed": len(removed)}
+        groups = self.groups()
+        with self.connection:
+            for path in removed:
+                self.forget(groups, path, manifest[path][0])
+                self.connection.execute("DELETE FROM files WHERE path = ?", (path,))
+            for path, digest, rows in summaries:
+                paradigm, size, mtime_ns = files[path]
+                if rows is None:
+                    # Same content under a new mtime, e.g. after a copy; only the stat changes.
+                    report["touched"] += 1
+                else:
+                    report["changed" if path in manifest else "new"] += 1
+                    if path in manifest:
+                        self.forget(groups, path, manifest[path][0])
+                    self.connection.executemany("INSERT INTO session_rows VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                                [(path, *row) for row in rows])
+                    self.merge(groups, paradigm, rows, 1)
+                self.connection.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+                                        (path, paradigm, size, mtime_ns, digest))
+            for group in groups.values():
+                if isinstance(group[5], list):
+                    group[5] = merge_rt(*zip(*group[5]))
+            self.connection.execute("DELETE FROM cohort")
+            self.connection.executemany("INSERT INTO cohort VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                        [(*key, *group) for key, group in groups.items() if group[0] > 0])
+        report["unchanged"] = len(files) - len(summaries)
+        return report
+
+    def scores(self, paradigm):
+        steps, _ = PARADIGMS[paradigm]
+        groups = sorted((steps.index(step), epoch, group) for (name, step, epoch), group in self.groups().items()
+                        if name == paradigm and step in steps)
+        if not groups:
+            return None, None
+        codes = np.array([[code for code, _, _ in groups], [epoch for _, epoch, _ in groups]], dtype=np.int64)
+        counts = np.array([group[1:5] for _, _, group in groups], dtype=np.int64).T
+        scores = rate_scores(counts)
+        scores["Sessions"] = np.array([group[0] for _, _, group in groups], dtype=np.int64)
+        histograms = [unpack_rt(group[5]) for _, _, group in groups]
+        rt_count = np.array([counts.sum() for _, counts in histograms])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores["RTMean"] = np.array([float(values @ counts) for values, counts in histograms]) / rt_count
+        for name, q in [("RTMedian", 50)] + [(f"RT{p}", p) for p in PERCENTILES]:
+            scores[name] = np.array([rt_percentile(values, counts, q) if counts.sum() else np.nan
+                                     for values, counts in histograms])
+        return codes, scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score every session under the log folder, re-reading only new or "
+                                                 "changed session files")
+    parser.add_argument("folder", nargs="?", default=LOG_FOLDER)
+    parser.add_argument("--cache", default=None, help=f"manifest and summary cache (default: FOLDER/{CACHE_NAME})")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--rebuild", action="store_true", help="discard the cache and re-read every session")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    cache = CohortCache(args.cache or os.path.join(args.folder, CACHE_NAME))
+    if args.rebuild:
+        with cache.connection:
+            cache.clear()
+    report = cache.refresh(args.folder, args.workers)
+    rows = []
+    for paradigm in PARADIGMS:
+        groups, scores = cache.scores(paradigm)
+        if groups is not None:
+            rows += score_table(paradigm, groups, scores)
+    cache.close()
+    print(f"{args.folder}: {report['new']} new, {report['changed']} changed, {report['touched']} touched, "
+          f"{report['removed']} removed, {report['unchanged']} unchanged sessions in "
+          f"{time.perf_counter() - start_time:.2f}s", file=sys.stderr)
+
+    logs = "\n".join(",".join(row) for row in [SCORE_HEADERS] + rows)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(logs)
+    else:
+        print(logs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import datetime
+import json
+import math
+import os
+
+import numpy as np
+
+from catalog import register
+from summary import RESULTS, CORRECT, WRONG, MISS, PASS
+from writer import session_station, session_participant
+
+EVENT_KINDS = ["start", "end", "onset", "flip", "dropped", "press", "bounce", "ignored"]
+
+
+def metadata(summary, **fields):
+    targets = summary.correct_count + summary.miss_count
+    lures = summary.wrong_count + summary.pass_count
+    result = {
+        "trials": summary.total,
+        "correct": summary.counts[CORRECT],
+        "wrong": summary.counts[WRONG],
+        "miss": summary.counts[MISS],
+        "pass": summary.counts[PASS],
+        "hit_rate": summary.correct_count / targets if targets else None,
+        "false_alarm_rate": summary.wrong_count / lures if lures else None,
+        "rt_mean": summary.rt_mean if summary.rt_count else None,
+        "rt_sd": math.sqrt(summary.rt_variance) if summary.rt_count > 1 else None,
+        "dropped_frames": sum(event[3] for event in summary.events if event[1] == "dropped"),
+        "end_time": datetime.datetime.now().isoformat(timespec="milliseconds"),
+    }
+    result.update(fields)
+    return result
+
+
+def trial_columns(summary):
+    store = summary.records
+    columns = {"turn": np.arange(1, len(store) + 1, dtype=np.int32)}
+    # Zero-copy views; the session is closed by the time it is exported, so nothing appends while they are alive.
+    columns.update(store.numpy())
+    return columns, {"outcome": RESULTS, "stimulus": store.stimuli, "step": store.steps}
+
+
+def event_columns(summary):
+    events = summary.events
+    steps = sorted({event[2] for event in events})
+    columns = {
+        "time": np.array([event[0] for event in events], dtype=np.int64),
+        "kind": np.array([EVENT_KINDS.index(event[1]) for event in events], dtype=np.int8),
+        "step": np.array([steps.index(event[2]) for event in events], dtype=np.int8),
+        "frame": np.array([event[3] for event in events], dtype=np.int32),
+        "planned": np.array([event[4] for event in events], dtype=np.float64),
+        "actual": np.array([event[5] for event in events], dtype=np.float64),
+    }
+    return columns, {"kind": EVENT_KINDS, "step": steps}
+
+
+def write_tables(base, tables, fields):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        arrays = {"metadata": np.array(json.dumps(fields, ensure_ascii=False))}
+        for table, (columns, names) in tables.items():
+            arrays.update({f"{table}.{name}": column for name, column in columns.items()})
+            arrays.update({f"{table}.{name}.names": np.array(values, dtype=str) for name, values in names.items()})
+        np.savez(base + ".npz", **arrays)
+        return base + ".npz"
+
+    schema_metadata = {"session": json.dumps(fields, ensure_ascii=False)}
+    for table, (columns, names) in tables.items():
+        arrays = {name: pa.DictionaryArray.from_arrays(column, names[name]) if name in names else pa.array(column)
+                  for name, column in columns.items()}
+        pq.write_table(pa.table(arrays, metadata=schema_metadata), f"{base}.{table}.parquet")
+    return f"{base}.trials.parquet"
+
+
+def read_tables(path):
+    if path.endswith(".npz"):
+        with np.load(path) as arrays:
+            fields = json.loads(str(arrays["metadata"]))
+            tables = {}
+            for key in arrays.files:
+                table, _, name = key.partition(".")
+                if name.endswith(".names"):
+                    tables.setdefault(table, ({}, {}))[1][name[:-len(".names")]] = arrays[key].tolist()
+                elif name:
+                    tables.setdefault(table, ({}, {}))[0][name] = arrays[key]
+        return fields, tables
+
+    import pyarrow.parquet as pq
+
+    base = path[:-len(".trials.parquet")]
+    fields, tables = None, {}
+    for table in ("trials", "events"):
+        data = pq.read_table(f"{base}.{table}.parquet")
+        fields = fields or json.loads(data.schema.metadata[b"session"])
+        columns, names = {}, {}
+        for name in data.column_names:
+            column = data.column(name).combine_chunks()
+            if hasattr(column, "dictionary"):
+                columns[name] = column.indices.to_numpy()
+                names[name] = column.dictionary.to_pylist()
+            else:
+                columns[name] = column.to_numpy()
+        tables[table] = columns, names
+    return fields, tables
+
+
+def export_session(folder, name, summary, fields, index_path):
+    fields = metadata(summary, **{"session": name, "participant": session_participant(name),
+                                  "station": session_station(name), "status": "complete",
+                                  "csv_path": os.path.join(folder, f"{name}.csv"), **fields})
+    tables = {"trials": trial_columns(summary), "events": event_columns(summary)}
+    fields["data_path"] = write_tables(os.path.join(folder, name), tables, fields)
+    register(fields, index_path)
+    return fields
@@ -0,0 +1,133 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+from PySide6.QtCore import QObject, QTimer, Qt
+
+from timing import now
+
+INSTRUMENT = "--instrument" in sys.argv or bool(os.environ.get("PARADIGM_INSTRUMENT"))
+SIGNIFICANT_BITS = 7
+HEARTBEAT_INTERVAL = 5
+STALL_TRACE_THRESHOLD = 10_000_000
+PERCENTILES = [50, 90, 99, 99.9]
+
+
+class Histogram:
+    # Log-linear buckets: values keep their top SIGNIFICANT_BITS bits, so every bucket is within
+    # 1 / 2 ** (SIGNIFICANT_BITS - 1) of the values it holds however large they get.
+    def __init__(self, significant_bits=SIGNIFICANT_BITS):
+        self.significant_bits = significant_bits
+        self.buckets = {}
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def record(self, value):
+        value = max(0, int(value))
+        shift = max(0, value.bit_length() - self.significant_bits)
+        bucket = value >> shift << shift
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.min = min(self.min, value) if self.count else value
+        self.max = max(self.max, value)
+        self.count += 1
+        self.total += value
+
+    def percentile(self, percentile):
+        if not self.count:
+            return 0
+        rank = percentile / 100 * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(bucket, self.max)
+        return self.max
+
+    def report(self):
+        return {
+            "count": self.count,
+            "min": self.min / 1e6,
+            "max": self.max / 1e6,
+            "mean": self.total / self.count / 1e6 if self.count else 0.0,
+            **{f"p{percentile:g}": self.percentile(percentile) / 1e6 for percentile in PERCENTILES},
+            "buckets": sorted(self.buckets.items()),
+        }
+
+
+class Recorder(QObject):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.histograms = {}
+        self.trace = []
+        self.origin = now()
+        self.last_beat = 0
+
+        self.heartbeat = QTimer(self)
+        self.heartbeat.setTimerType(Qt.TimerType.PreciseTimer)
+        self.heartbeat.setInterval(HEARTBEAT_INTERVAL)
+        self.heartbeat.timeout.connect(self.beat)
+
+    def record(self, name, value):
+        if name not in self.histograms:
+            self.histograms[name] = Histogram()
+        self.histograms[name].record(value)
+
+    def span(self, name, start, duration, **args):
+        self.trace.append({"name": name, "ph": "X", "ts": (start - self.origin) / 1000, "dur": duration / 1000,
+                           "pid": os.getpid(), "tid": threading.get_ident(), "args": args})
+
+    def reset(self):
+        self.histograms = {}
+        self.trace = []
+        self.origin = now()
+        self.last_beat = 0
+        self.heartbeat.start()
+
+    def wrap(self, name, callback):
+        @functools.wraps(callback)
+        def timed(*args, **kwargs):
+            start, cpu_start = now(), time.thread_time_ns()
+            try:
+                return callback(*args, **kwargs)
+            finally:
+                duration, cpu = now() - start, time.thread_time_ns() - cpu_start
+                self.record(f"{name}.wall", duration)
+                self.record(f"{name}.cpu", cpu)
+                self.span(name, start, duration, cpu_ms=cpu / 1e6)
+
+        return timed
+
+    def fired(self, lateness):
+        self.record("timer.lateness", lateness)
+
+    def beat(self):
+        current = now()
+        if self.last_beat:
+            stall = current - self.last_beat - HEARTBEAT_INTERVAL * 1_000_000
+            self.record("loop.stall", stall)
+            if stall > STALL_TRACE_THRESHOLD:
+                self.span("stall", self.last_beat, current - self.last_beat)
+        self.last_beat = current
+
+    def dump(self, folder, name):
+        self.heartbeat.stop()
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, f"{name}.instrument.json"), "w") as f:
+            json.dump({key: histogram.report() for key, histogram in sorted(self.histograms.items())}, f)
+        with open(os.path.join(folder, f"{name}.trace.json"), "w") as f:
+            json.dump({"traceEvents": self.trace, "displayTimeUnit": "ms"}, f)
+
+
+def attach(widget, owner, names, scheduler):
+    recorder = Recorder(widget)
+    for name in names:
+        attribute = f"_{owner.__name__}__{name}"
+        attribute = attribute if hasattr(widget, attribute) else name
+        setattr(widget, attribute, recorder.wrap(name, getattr(widget, attribute)))
+    scheduler.on_fire = recorder.fired
+    return recorder
@@ -0,0 +1,253 @@
+import argparse
+import os
+import queue
+import socket
+import statistics
+import struct
+import sys
+import threading
+import time
+
+from timing import now
+
+MAGIC = b"PDMK"
+VERSION = 1
+HEADER = struct.Struct("<4sBBIqH")
+KINDS = ["block_start", "block_end", "stimulus", "onset", "response", "feedback", "blank", "probe",
+         "sync", "sync_reply", "offset"]
+SYNC_ROUNDS = 8
+SYNC_INTERVAL = 5.0
+SYNC_TIMEOUT = 0.2
+STOP = object()
+STREAMS = {}
+
+
+def parse(target):
+    scheme, _, address = target.rpartition("://")
+    host, _, port = address.rpartition(":")
+    return scheme or "udp", (host or "127.0.0.1", int(port))
+
+
+def pack(kind, sequence, timestamp, payload=""):
+    data = payload.encode()
+    return HEADER.pack(MAGIC, VERSION, KINDS.index(kind), sequence, timestamp, len(data)) + data
+
+
+def unpack(packet):
+    magic, version, kind, sequence, timestamp, length = HEADER.unpack_from(packet)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"not a version {VERSION} marker packet")
+    return KINDS[kind], sequence, timestamp, packet[HEADER.size:HEADER.size + length].decode()
+
+
+def receive_exact(connection, size):
+    data = b""
+    while len(data) < size:
+        chunk = connection.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("marker connection closed")
+        data += chunk
+    return data
+
+
+def read_packet(connection, scheme):
+    if scheme == "udp":
+        return connection.recv(65536)
+    header = receive_exact(connection, HEADER.size)
+    return header + receive_exact(connection, HEADER.unpack(header)[-1])
+
+
+class MarkerStream:
+    def __init__(self, target):
+        self.target = target
+        self.scheme, self.address = parse(target)
+        self.queue = queue.SimpleQueue()
+        self.sequence = 0
+        self.sent = 0
+        self.failed = 0
+        self.offset = None
+        self.rtt = None
+        self.thread = threading.Thread(target=self.run, name="markers", daemon=True)
+        self.thread.start()
+
+    def send(self, kind, payload="", timestamp=None):
+        # The GUI thread only stamps and enqueues; packing and socket writes happen on the sender thread.
+        self.queue.put((kind, now() if timestamp is None else timestamp, payload))
+
+    def connect(self):
+        if self.scheme == "tcp":
+            connection = socket.create_connection(self.address, SYNC_TIMEOUT)
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        else:
+            connection = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            connection.connect(self.address)
+        connection.settimeout(SYNC_TIMEOUT)
+        return connection
+
+    def transmit(self, connection, kind, timestamp, payload=""):
+        self.sequence += 1
+        connection.sendall(pack(kind, self.sequence, timestamp, payload))
+
+    def synchronise(self, connection):
+        # NTP-style rounds; the one with the shortest round trip bounds the offset error most tightly.
+        best = None
+        for _ in range(SYNC_ROUNDS):
+            sent_time = now()
+            try:
+                self.transmit(connection, "sync", sent_time)
+                while True:
+                    kind, sequence, remote_time, _ = unpack(read_packet(connection, self.scheme))
+                    if kind == "sync_reply" and sequence == self.sequence:
+                        break
+            except OSError:
+                continue
+            received_time = now()
+            rtt = received_time - sent_time
+            if best is None or rtt < best[0]:
+                best = rtt, remote_time - (sent_time + received_time) // 2
+        if best:
+            self.rtt, self.offset = best
+            self.transmit(connection, "offset", self.offset, f"rtt={self.rtt}")
+
+    def run(self):
+        connection = None
+        while True:
+            try:
+                item = self.queue.get(timeout=SYNC_INTERVAL if connection else SYNC_TIMEOUT)
+            except queue.Empty:
+                item = None
+            if item is STOP:
+                break
+            try:
+                if connection is None:
+                    connection = self.connect()
+                    self.synchronise(connection)
+                elif item is None:
+                    self.synchronise(connection)
+                if item is not None:
+                    self.transmit(connection, *item)
+                    self.sent += 1
+            except OSError:
+                if item is not None:
+                    self.failed += 1
+                if self.scheme == "tcp" and connection:
+                    connection.close()
+                    connection = None
+        if connection:
+            connection.close()
+
+    def close(self):
+        self.queue.put(STOP)
+        self.thread.join(SYNC_TIMEOUT * SYNC_ROUNDS)
+
+    @property
+    def report(self):
+        clock = f"offset: {self.offset / 1e6:.3f}ms rtt: {self.rtt / 1e6:.3f}ms" if self.rtt is not None else \
+            "offset: unknown"
+        return f"markers {self.target} sent: {self.sent} failed: {self.failed} {clock}"
+
+
+class MarkerReceiver:
+    def __init__(self, target):
+        self.scheme, self.address = parse(target)
+        kind = socket.SOCK_STREAM if self.scheme == "tcp" else socket.SOCK_DGRAM
+        self.socket = socket.socket(socket.AF_INET, kind)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.socket.bind(self.address)
+        if self.scheme == "tcp":
+            self.socket.listen(1)
+        self.offset = 0
+        self.latencies = []
+
+    def packets(self):
+        if self.scheme == "udp":
+            while True:
+                packet, sender = self.socket.recvfrom(65536)
+                yield packet, lambda reply, sender=sender: self.socket.sendto(reply, sender)
+        while True:
+            connection, _ = self.socket.accept()
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with connection:
+                try:
+                    while True:
+                        yield read_packet(connection, "tcp"), connection.sendall
+                except ConnectionError:
+                    continue
+
+    def serve(self, count=0, verbose=True):
+        for packet, reply in self.packets():
+            received_time = now()
+            kind, sequence, timestamp, payload = unpack(packet)
+            if kind == "sync":
+                reply(pack("sync_reply", sequence, now()))
+            elif kind == "offset":
+                self.offset = timestamp
+                if verbose:
+                    print(f"offset {timestamp / 1e6:.3f}ms {payload}", flush=True)
+            else:
+                latency = received_time - timestamp - self.offset
+                self.latencies.append(latency)
+                if verbose:
+                    print(f"{sequence} {kind} {payload} latency {latency / 1e6:.3f}ms", flush=True)
+                if len(self.latencies) == count:
+                    return
+
+    @property
+    def report(self):
+        if len(self.latencies) < 2:
+            return "marker latency: too few markers"
+        latencies = [latency / 1e6 for latency in self.latencies]
+        percentiles = statistics.quantiles(latencies, n=1000)
+        return (f"marker latency over {len(latencies)}: mean {statistics.fmean(latencies):.3f}ms "
+                f"p50 {percentiles[499]:.3f}ms p99 {percentiles[989]:.3f}ms max {max(latencies):.3f}ms")
+
+
+def marker_target():
+    return sys.argv[sys.argv.index("--markers") + 1] if "--markers" in sys.argv[:-1] else \
+        os.environ.get("PARADIGM_MARKERS")
+
+
+def connect(target):
+    return MarkerStream(target) if target else None
+
+
+def markers():
+    # Connected when the first block starts rather than at import, so startup opens no socket before first paint.
+    target = marker_target()
+    if target not in STREAMS:
+        STREAMS[target] = connect(target)
+    return STREAMS[target]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Receive paradigm markers and measure their latency")
+    parser.add_argument("target", help="udp://host:port or tcp://host:port")
+    parser.add_argument("--count", type=int, default=0, help="stop after this many markers")
+    parser.add_argument("--probe", type=int, default=0, help="send this many probe markers instead of receiving")
+    parser.add_argument("--interval", type=float, default=1.0, help="milliseconds between probe markers")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    if args.probe:
+        stream = MarkerStream(args.target)
+        enqueue = []
+        for i in range(args.probe):
+            start = now()
+            stream.send("probe", str(i))
+            enqueue.append(now() - start)
+            time.sleep(args.interval / 1000)
+        stream.close()
+        print(stream.report)
+        print(f"enqueue mean {statistics.fmean(enqueue) / 1e3:.2f}us max {max(enqueue) / 1e3:.2f}us")
+        return
+
+    receiver = MarkerReceiver(args.target)
+    try:
+        receiver.serve(args.count, not args.quiet)
+    except KeyboardInterrupt:
+        pass
+    print(receiver.report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,500 @@
+import concurrent.futures
+import datetime
+import functools
+import os
+import random
+import sys
+
+from PySide6.QtCore import QEvent, QTimer, Signal
+from PySide6.QtGui import QColor, Qt
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QPushButton, QLabel, QHBoxLayout
+
+from audio import AUDIO_BANK
+from instrument import INSTRUMENT, attach
+from markers import markers
+from canvas import StimulusCanvas
+from catalog import name_time
+from plan import load_config, compile_plan, layout_plan, generate_trials, bars
+from response import ResponseInput
+from scheduler import make_scheduler
+from stimulus import STIMULUS_CACHE
+from summary import Summary
+from table import RecordTable
+from timing import now
+from writer import TrialWriter, recover, session_id, PARTIAL_SUFFIX, RECOVERED_SUFFIX
+
+RESULT_HEADERS = ["Turn", "Elapse", "Result", "Step", "Onset", "Response"]
+INDEX_NAME = "sessions.sqlite"
+SEED = int(os.environ["PARADIGM_SEED"]) if os.environ.get("PARADIGM_SEED") else None
+BOARD_SIZE = 2
+
+START_TEXT = "开始"
+PRESS_TEXT = "按下"
+RESTART_TEXT = "重新练习"
+FINISH_TEXT = "游戏结束，点击重新开始"
+COUNTDOWN_TEXT = "下一轮倒计时：{}"
+GENERATING_TEXT = "正在准备题目，请稍候……"
+GENERATION_FAILED_TEXT = "题目生成失败：{}\n点击开始重试"
+BOX_FAILED_TEXT = "反应盒不可用，请使用空格键：{}"
+MOUSE_SOURCE = "mouse"
+SEED_PREFIX = "seed: "
+INSTRUMENTED = ["show", "pause", "press", "trigger", "paint", "break", "start_block", "end_block", "set_table"]
+FEEDBACK = {
+    True: QColor("green"),
+    False: QColor("red"),
+}
+
+
+def target_rates(summary):
+    targets = summary.correct_count + summary.miss_count
+    others = summary.wrong_count + summary.pass_count
+    return (round(summary.correct_count * 100 / targets) if targets else 0,
+            round(summary.wrong_count * 100 / others) if others else 0,
+            round(summary.miss_count * 100 / targets) if targets else 0)
+
+
+def logged_seed(path):
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                if line.startswith(SEED_PREFIX):
+                    return int(line[len(SEED_PREFIX):])
+    return None
+
+
+def total_rates(summary):
+    return tuple(round(count * 100 / summary.total) if summary.total else 0
+                 for count in (summary.correct_count, summary.wrong_count, summary.miss_count))
+
+
+RATES = {
+    "target": target_rates,
+    "total": total_rates,
+}
+PLANNER = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="planner")
+
+
+class Paradigm:
+    def __init__(self, path):
+        self.path = path
+        self.config = load_config(path)
+        self.name = self.config["name"]
+        self.log_folder = self.config["log_folder"]
+        self.timing = self.config["timing"]
+        self.bars = bars(self.config)
+        self.template = "\n".join(self.config["result_template"])
+
+    @property
+    def index_path(self):
+        return os.path.join(os.path.dirname(self.log_folder), INDEX_NAME)
+
+    @property
+    def image_folders(self):
+        return sorted({step["images"] for step in self.config["steps"].values()})
+
+    def images(self):
+        return {name: [os.path.basename(path) for path in STIMULUS_CACHE.load(step["images"])]
+                for name, step in self.config["steps"].items()}
+
+    def new_seed(self):
+        return SEED if SEED is not None else random.getrandbits(32)
+
+    def compile(self, rng=random):
+        return compile_plan(self.config, self.images(), rng)
+
+    def generate(self, rng=random):
+        # Lay the plan out now so instructions can show; the trial sequences follow from the planner thread.
+        plan = layout_plan(self.config)
+        return plan, PLANNER.submit(generate_trials, plan, self.images(), rng)
+
+    def summary(self):
+        return Summary(self.timing["show"], self.timing["ready"])
+
+    def result_args(self, summary):
+        correct_rate, wrong_rate, miss_rate = RATES[self.config["rates"]](summary)
+        return (summary.correct_count, summary.correct_count, correct_rate, summary.wrong_count, wrong_rate,
+                summary.miss_count, miss_rate)
+
+    def result_text(self, summary, prefix=""):
+        text = self.template.format(*self.result_args(summary))
+        return f"{prefix}\n{text}" if prefix else text
+
+    def export(self, summary, fields, folder, name):
+        try:
+            from export import export_session
+        except ImportError as e:
+            # The CSV and TXT logs are already closed; only the columnar copy and the index row are skipped.
+            print(f"session {name} not exported: {e}", file=sys.stderr)
+            return None
+        return export_session(folder, name, summary, {"paradigm": self.name, **fields}, self.index_path)
+
+    def recover_logs(self):
+        def finish(folder, name, rows):
+            summary = self.summary()
+            for row in rows:
+                summary.restore(*row[1:])
+            seed = logged_seed(os.path.join(folder, f"{name}.txt{PARTIAL_SUFFIX}"))
+            self.export(summary, {"status": "recovered", "start_time": name_time(name), "seed": seed,
+                                  "csv_path": os.path.join(folder, f"{name}{RECOVERED_SUFFIX}.csv")}, folder, name)
+            return self.result_text(summary) if summary.total else ""
+
+        return recover(self.log_folder, finish)
+
+
+class ProgressBar(QWidget):
+    def __init__(self, bars):
+        super().__init__()
+        layout = QHBoxLayout()
+        self.current_index = 0
+        self.setLayout(layout)
+
+        self.bars = []
+        for bar in bars:
+            label = QLabel()
+            label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            label.setWordWrap(True)
+            font = label.font()
+            font.setPointSize(20)
+            label.setFont(font)
+            label.setText(bar)
+            self.bars.append(label)
+            layout.addWidget(label)
+
+    def highlight_index(self, index):
+        self.current_index = index
+        for i, bar in enumerate(self.bars):
+            if i != self.current_index:
+                bar.setStyleSheet("")
+            else:
+                bar.setStyleSheet("background-color: rgb(255,228,98);")
+
+
+class ParadigmWidget(QWidget):
+    finished = Signal(str)
+    generated = Signal(object)
+
+    is_start = False
+
+    current_counter = 0
+    current_image = ""
+    current_sound = ""
+    current_target = False
+
+    participant = None
+    session = ""
+    session_start = None
+
+    summary = None
+    session_summary = None
+    generation = None
+    waiting = False
+    seed = None
+    marker_stream = None
+
+    def __init__(self, paradigm):
+        super().__init__()
+        self.paradigm = paradigm
+        self.plan = []
+        self.stage_index = 0
+        self.block_index = 0
+        self.trials = []
+        self.trial_index = 0
+        self.recording = []
+        self.step = ""
+
+        self.image_paths = [path for folder in paradigm.image_folders for path in STIMULUS_CACHE.load(folder)]
+        self.progress_bar = ProgressBar(paradigm.bars)
+        self.display = StimulusCanvas()
+        self.responses = ResponseInput(self)
+        self.button = QPushButton()
+        self.restart_button = QPushButton()
+        self.table = RecordTable(RESULT_HEADERS)
+        self.scheduler = make_scheduler(self)
+        self.recorder = attach(self, ParadigmWidget, INSTRUMENTED, self.scheduler) if INSTRUMENT else None
+
+        self.build_ui()
+        self.display.installEventFilter(self)
+        self.display.painted.connect(self.__paint)
+
+        self.responses.pressed.connect(self.__press)
+        self.responses.failed.connect(self.__box_failed)
+        self.generated.connect(self.__generated)
+        self.button.clicked.connect(self.__click)
+        self.restart_button.clicked.connect(self.__restart)
+
+    @property
+    def stage(self):
+        return self.plan[self.stage_index]
+
+    @property
+    def block(self):
+        return self.stage.blocks[self.block_index]
+
+    def marker(self, kind, payload="", timestamp=None):
+        if self.marker_stream:
+            self.marker_stream.send(kind, payload, timestamp)
+
+    def stop_media(self):
+        AUDIO_BANK.stop()
+
+    def build_ui(self):
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+        layout.addWidget(self.progress_bar, 1)
+
+        h_layout = QHBoxLayout()
+
+        font = self.display.font()
+        font.setPointSize(30)
+        self.display.setFont(font)
+        h_layout.addWidget(self.display, 2)
+
+        h_layout.addWidget(self.table, 1)
+        self.table.hide()
+
+        layout.addLayout(h_layout, 4)
+
+        h_layout = QHBoxLayout()
+        font = self.button.font()
+        font.setPointSize(24)
+        self.button.setFont(font)
+        self.button.setStyleSheet("background-color: rgb(255,228,98);")
+        h_layout.addWidget(self.button, 5)
+        font = self.restart_button.font()
+        font.setPointSize(24)
+        self.restart_button.setFont(font)
+        self.restart_button.setStyleSheet("background-color: rgb(255,228,98);")
+        h_layout.addWidget(self.restart_button, 1)
+        self.restart_button.setText(RESTART_TEXT)
+        layout.addLayout(h_layout, 1)
+
+    def eventFilter(self, watched, event):
+        if watched is self.display and event.type() == QEvent.Type.Resize:
+            STIMULUS_CACHE.rescale(self.image_paths, *self.display_size)
+        return super().eventFilter(watched, event)
+
+    @property
+    def display_size(self):
+        return (self.display.width() - BOARD_SIZE * 2, self.display.height() - BOARD_SIZE * 4,
+                self.display.devicePixelRatioF())
+
+    def set_table(self):
+        self.session_summary.log(STIMULUS_CACHE.report)
+        self.session_summary.log(AUDIO_BANK.report)
+        if self.marker_stream:
+            self.session_summary.log(self.marker_stream.report)
+        fields = {"start_time": self.session_start.isoformat(timespec="milliseconds"), "seed": self.seed}
+        self.session_summary.close(self.paradigm.result_text(self.session_summary),
+                                   functools.partial(self.paradigm.export, self.session_summary, fields))
+        self.table.record_model.set_records(self.session_summary.records)
+        self.table.show()
+        if self.recorder:
+            QTimer.singleShot(0, functools.partial(self.recorder.dump, self.paradigm.log_folder, self.session))
+
+        self.button.setText(FINISH_TEXT)
+        self.finished.emit(self.session)
+
+    def set_image(self, image):
+        self.current_image = image
+        pix_map = STIMULUS_CACHE.pixmap(os.path.join(self.block.folder, image), *self.display_size)
+        self.display.set_pixmap(pix_map)
+
+    def set_prompt(self, prompt):
+        if isinstance(prompt, tuple):
+            self.display.set_text(prompt[0])
+            AUDIO_BANK.play(prompt[1])
+        else:
+            self.display.set_text(prompt)
+
+    def set_button(self, prompt):
+        if isinstance(prompt, tuple):
+            self.button.setText(prompt[0])
+            AUDIO_BANK.play(prompt[1])
+        else:
+            self.button.setText(prompt)
+
+    def __generated(self, generation):
+        if generation is self.generation and self.waiting:
+            self.waiting = False
+            self.start_block()
+
+    def __box_failed(self, message):
+        if self.session_summary and self.session_summary.writer:
+            self.session_summary.log(message)
+        if not self.is_start:
+            self.display.set_text(BOX_FAILED_TEXT.format(message))
+
+    def __restart(self):
+        self.prepare(self.stage_index)
+
+    def __click(self):
+        if self.is_start:
+            self.__press(now(), MOUSE_SOURCE, False)
+        elif self.block_index < len(self.stage.blocks):
+            self.start_block()
+        elif self.stage_index + 1 < len(self.plan):
+            self.prepare(self.stage_index + 1)
+        else:
+            self.prepare_practice_1()
+
+    def prepare_practice_1(self):
+        if self.session_summary:
+            self.session_summary.abandon()
+        self.session_summary = self.paradigm.summary()
+        # The whole plan comes from this one seed, so a logged seed is enough to regenerate every sequence.
+        self.seed = self.paradigm.new_seed()
+        self.plan, self.generation = self.paradigm.generate(random.Random(self.seed))
+        self.generation.add_done_callback(self.generated.emit)
+        if self.recorder:
+            self.recorder.reset()
+        self.table.hide()
+        self.prepare(0)
+
+    def prepare(self, stage_index):
+        self.scheduler.stop()
+        self.is_start = False
+        self.waiting = False
+        self.stage_index = stage_index
+        self.block_index = 0
+        self.current_counter = self.paradigm.timing["break_count"]
+        self.summary = self.paradigm.summary()
+
+        self.step = self.block.step
+        self.progress_bar.highlight_index(self.block.bar)
+        self.set_prompt(self.stage.prompt)
+        self.restart_button.hide()
+        self.button.setText(START_TEXT)
+        self.button.setEnabled(True)
+
+    def start_block(self):
+        if not self.generation.done():
+            self.waiting = True
+            self.button.setEnabled(False)
+            self.set_prompt(GENERATING_TEXT)
+            return
+        if error := self.generation.exception():
+            # The planner gave up on this seed; start over from the first prompt with a new one.
+            self.prepare_practice_1()
+            self.display.set_text(GENERATION_FAILED_TEXT.format(error))
+            return
+        self.step = self.block.step
+        self.trials = self.block.trials
+        self.trial_index = 0
+        self.marker_stream = markers()
+        if self.stage.is_test:
+            if not self.session_summary.writer:
+                self.session = session_id(self.participant)
+                self.session_start = datetime.datetime.now()
+                self.session_summary.stream(TrialWriter(self.paradigm.log_folder, RESULT_HEADERS, self.session))
+                self.session_summary.log(f"{SEED_PREFIX}{self.seed}")
+                self.table.record_model.set_records(self.session_summary.records)
+            self.session_summary.record_start(self.step)
+            self.recording = [self.session_summary, self.summary]
+        else:
+            self.recording = [self.summary]
+
+        self.marker("block_start", f"{self.stage.kind}:{self.step}")
+        self.table.hide()
+        self.button.setText(PRESS_TEXT)
+        self.button.setEnabled(False)
+        self.display.set_feedback(None)
+        self.scheduler.start()
+        self.is_start = True
+        if self.stage.is_test:
+            self.set_prompt(self.block.prompt)
+            self.scheduler.after(self.paradigm.timing["ready"], self.__show)
+        else:
+            self.__show()
+
+    def end_block(self):
+        self.marker("block_end", f"{self.stage.kind}:{self.step}")
+        if self.stage.is_test:
+            self.session_summary.record_end(self.step, *self.scheduler.take_frames())
+        self.block_index += 1
+        if self.block_index < len(self.stage.blocks):
+            self.progress_bar.highlight_index(self.block.bar)
+            self.set_prompt(self.block.prompt)
+            self.scheduler.start()
+            self.__break()
+        else:
+            self.end_stage()
+
+    def end_stage(self):
+        self.is_start = False
+        self.button.setEnabled(True)
+        self.display.set_feedback(None)
+        self.display.set_text(self.paradigm.result_text(self.summary, self.stage.result_prefix))
+        if self.stage_index + 1 == len(self.plan):
+            self.progress_bar.highlight_index(len(self.paradigm.bars) - 1)
+            self.set_table()
+            return
+        if not self.stage.is_test:
+            self.restart_button.show()
+        self.set_button(self.stage.next_prompt)
+
+    def __press(self, press_time, source, bounced):
+        if not self.is_start:
+            if not bounced and self.button.isEnabled():
+                self.__click()
+            return
+        status = "bounce" if bounced else "press" if self.button.isEnabled() else "ignored"
+        for summary in self.recording:
+            summary.record_press(self.step, press_time, source, status)
+        if status == "press":
+            if self.recorder:
+                self.recorder.record("input.latency", now() - press_time)
+            self.__trigger(press_time)
+
+    def __trigger(self, response_time):
+        self.button.setEnabled(False)
+        self.marker("response", self.current_image, response_time)
+        self.marker("feedback", "correct" if self.current_target else "wrong")
+        for summary in self.recording:
+            summary.record(self.current_target, self.step, response_time)
+        self.display.set_feedback(FEEDBACK[self.current_target])
+        self.table.record_model.refresh()
+
+    def __paint(self, onset_time):
+        if self.is_start:
+            self.marker("onset", self.current_image, onset_time)
+            for summary in self.recording:
+                summary.record_paint(onset_time)
+            self.table.record_model.refresh()
+
+    def __show(self):
+        self.display.set_feedback(None)
+        if self.trial_index == len(self.trials):
+            self.end_block()
+            return
+
+        image, self.current_target, *sound = self.trials[self.trial_index]
+        self.trial_index += 1
+        self.set_image(image)
+        self.marker("stimulus", image)
+        if sound:
+            self.current_sound = sound[0]
+            AUDIO_BANK.play(self.current_sound)
+            self.marker("sound", self.current_sound)
+        onset = self.scheduler.mark()
+        for summary in self.recording:
+            summary.record("miss" if self.current_target else "pass", self.step, stimulus=image)
+            summary.record_onset(self.step, *onset)
+        self.table.record_model.refresh()
+
+        self.button.setEnabled(True)
+        self.scheduler.after(self.paradigm.timing["show"], self.__pause)
+
+    def __pause(self):
+        self.display.clear()
+        self.marker("blank")
+        self.scheduler.after(self.paradigm.timing["pause"], self.__show)
+
+    def __break(self):
+        self.button.setEnabled(False)
+        self.set_prompt(COUNTDOWN_TEXT.format(self.current_counter))
+        self.current_counter -= 1
+        if self.current_counter > 0:
+            self.scheduler.after(self.paradigm.timing["break_tick"], self.__break)
+        else:
+            self.current_counter = self.paradigm.timing["break_count"]
+            self.scheduler.after(self.paradigm.timing["break_tick"], self.start_block)
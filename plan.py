@@ -0,0 +1,179 @@
+import glob
+import json
+import os
+import random
+import tomllib
+
+from sequence import n_back_sequence, dual_n_back_sequence, classify, classify_streams, TARGET
+
+PRACTICE = "practice"
+TEST = "test"
+STREAMS = ["visual", "auditory"]
+MAX_ATTEMPTS = 1000
+PARADIGM_FOLDER = "assets/paradigms"
+
+
+def load_config(path):
+    if path.endswith(".toml"):
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def paradigm_paths(folder=PARADIGM_FOLDER):
+    paths = sorted(glob.glob(os.path.join(folder, "*.json")) + glob.glob(os.path.join(folder, "*.toml")))
+    return {load_config(path)["name"]: path for path in paths}
+
+
+def step_turns(config):
+    # Only test blocks reach the session log; epochs count whole blocks of each step.
+    turns = {}
+    for stage in config["stages"]:
+        if stage["kind"] == TEST:
+            for block in stage["blocks"]:
+                turns.setdefault(block["step"], stage["turns"])
+    return list(turns), list(turns.values())
+
+
+def prompt(value):
+    return tuple(value) if isinstance(value, list) else value
+
+
+def mark_targets(sequence, rule):
+    if rule["kind"] == "dual_n_back":
+        # Both streams are scored, but a single response channel means only one of them is the target.
+        stream = STREAMS.index(rule.get("respond", STREAMS[0]))
+        return [(image, kinds[stream] == TARGET, sound) for (image, sound), kinds
+                in zip(sequence, classify_streams(sequence, rule["back"]))]
+    if rule["kind"] == "n_back":
+        return [(image, kind == TARGET) for image, kind in zip(sequence, classify(sequence, rule["back"]))]
+    targets = set(rule["targets"])
+    return [(image, image in targets) for image in sequence]
+
+
+def set_trials(images, turns, rule, rng):
+    trials = images * (turns // len(images))
+    rng.shuffle(trials)
+    return mark_targets(trials, rule)
+
+
+def n_back_trials(images, turns, rule, rng):
+    return mark_targets(n_back_sequence(images, turns, rule["back"], int(turns * rule["targets"]),
+                                        rule.get("lures", 0), rng), rule)
+
+
+def dual_n_back_trials(images, turns, rule, rng):
+    return mark_targets(dual_n_back_sequence(images, rule["sounds"], turns, rule["back"], int(turns * rule["targets"]),
+                                             rule.get("lures", 0), rng), rule)
+
+
+def set_targets(images, turns, rule):
+    return turns // len(images) * len(set(images) & set(rule["targets"]))
+
+
+def n_back_targets(images, turns, rule):
+    return int(turns * rule["targets"])
+
+
+RULES = {
+    "set": set_trials,
+    "n_back": n_back_trials,
+    "dual_n_back": dual_n_back_trials,
+}
+TARGET_COUNTS = {
+    "set": set_targets,
+    "n_back": n_back_targets,
+    "dual_n_back": n_back_targets,
+}
+
+
+def longest_run(trials):
+    longest = run = 0
+    previous = None
+    for trial in trials:
+        target = trial[1]
+        run = run + 1 if target == previous else 1
+        previous = target
+        longest = max(longest, run)
+    return longest
+
+
+def violations(trials, expected, rule, previous=None):
+    problems = []
+    targets = sum(trial[1] for trial in trials)
+    if targets != expected:
+        problems.append(f"{targets} targets instead of {expected}")
+    if rule.get("max_run") and longest_run(trials) > rule["max_run"]:
+        problems.append(f"a run of {longest_run(trials)} exceeds {rule['max_run']}")
+    if previous is not None and trials and trials[0][0] == previous:
+        problems.append(f"{previous} repeats across the block boundary")
+    return problems
+
+
+def block_trials(images, turns, rule, rng, previous=None):
+    expected = TARGET_COUNTS[rule["kind"]](images, turns, rule)
+    for _ in range(MAX_ATTEMPTS):
+        trials = RULES[rule["kind"]](list(images), turns, rule, rng)
+        problems = violations(trials, expected, rule, previous)
+        if not problems:
+            return trials
+    raise ValueError(f"no valid {rule['kind']} sequence in {MAX_ATTEMPTS} attempts: {'; '.join(problems)}")
+
+
+class Block:
+    def __init__(self, step, bar, folder, prompt, turns, rule, trials=None):
+        self.step = step
+        self.bar = bar
+        self.folder = folder
+        self.prompt = prompt
+        self.turns = turns
+        self.rule = rule
+        self.trials = trials
+
+
+class Stage:
+    def __init__(self, kind, blocks, prompt, next_prompt, result_prefix):
+        self.kind = kind
+        self.blocks = blocks
+        self.prompt = prompt
+        self.next_prompt = next_prompt
+        self.result_prefix = result_prefix
+
+    @property
+    def is_test(self):
+        return self.kind == TEST
+
+
+def bars(config):
+    return [block["bar"] for stage in config["stages"] for block in stage["blocks"]] + [config["end_bar"]]
+
+
+def layout_plan(config):
+    stages = []
+    bar = 0
+    for stage in config["stages"]:
+        blocks = []
+        for block in stage["blocks"]:
+            step = config["steps"][block["step"]]
+            blocks.append(Block(block["step"], bar, step["images"], prompt(step["prompt"]), stage["turns"],
+                                step["rule"]))
+            bar += 1
+        stages.append(Stage(stage["kind"], blocks, prompt(stage.get("prompt", blocks[0].prompt)),
+                            prompt(stage.get("next")), stage.get("result_prefix", "")))
+    return stages
+
+
+def generate_trials(plan, images, rng=random):
+    # Blocks are generated in session order so each one can avoid opening on the image the previous one closed on.
+    last = None
+    for stage in plan:
+        for block in stage.blocks:
+            previous = last[1] if last and last[0] == block.folder else None
+            block.trials = block_trials(images[block.step], block.turns, block.rule, rng, previous)
+            last = block.folder, block.trials[-1][0]
+    return plan
+
+
+def compile_plan(config, images, rng=random):
+    return generate_trials(layout_plan(config), images, rng)
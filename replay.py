@@ -0,0 +1,151 @@
+import argparse
+import concurrent.futures
+import itertools
+import os
+import random
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication
+
+from benchmark import Harness
+from catalog import SessionIndex
+from export import read_tables, metadata
+from paradigm import Paradigm
+from plan import PARADIGM_FOLDER, mark_targets, paradigm_paths
+
+PRACTICE_RESPONSE = 400
+REPORT_FIELDS = ["session", "paradigm", "seed", "sequence", "trials", "changed", "rt_error_max", "correct", "wrong",
+                 "miss", "pass", "hit_rate", "false_alarm_rate", "rt_mean", "error"]
+
+
+def paradigm_path(name, folder=PARADIGM_FOLDER):
+    paths = paradigm_paths(folder)
+    if name not in paths:
+        raise ValueError(f"no paradigm named {name} in {folder}")
+    return paths[name]
+
+
+class LoggedSession:
+    def __init__(self, path):
+        self.path = path
+        self.fields, tables = read_tables(path)
+        columns, names = tables["trials"]
+        self.stimuli = [names["stimulus"][code] for code in columns["stimulus"]]
+        self.steps = [names["step"][code] for code in columns["step"]]
+        self.outcomes = [names["outcome"][code] for code in columns["outcome"]]
+        self.blocks = columns["block"].tolist()
+        self.onsets = columns["onset"].tolist()
+        self.responses = columns["response"].tolist()
+
+    @property
+    def seed(self):
+        return self.fields.get("seed")
+
+    def block_sequences(self):
+        return [[self.stimuli[i] for i, _ in rows] for _, rows in itertools.groupby(enumerate(self.blocks),
+                                                                                 lambda row: row[1])]
+
+    def response_times(self):
+        return [(response - onset) / 1e6 if response else None for onset, response in zip(self.onsets, self.responses)]
+
+
+class ReplayParadigm(Paradigm):
+    def __init__(self, path, session):
+        super().__init__(path)
+        self.session = session
+        self.sequence_match = None
+
+    def new_seed(self):
+        return self.session.seed or 0
+
+    def generate(self, rng=random):
+        plan = self.compile(rng)
+        blocks = [block for stage in plan if stage.is_test for block in stage.blocks]
+        logged = self.session.block_sequences()
+        if len(logged) != len(blocks):
+            raise ValueError(f"{self.session.path} has {len(logged)} test blocks, the plan has {len(blocks)}")
+        if self.session.seed is not None:
+            self.sequence_match = logged == [[trial[0] for trial in block.trials] for block in blocks]
+        # Test blocks show exactly what the participant saw; targets come from the current rules, which re-scores.
+        for block, sequence in zip(blocks, logged):
+            if block.rule["kind"] == "dual_n_back":
+                # Sounds are not logged per trial, so they come from the regenerated plan.
+                sequence = list(zip(sequence, [trial[2] for trial in block.trials]))
+            block.trials = mark_targets(sequence, block.rule)
+        generation = concurrent.futures.Future()
+        generation.set_result(plan)
+        return plan, generation
+
+
+class ReplayResponder:
+    harness = None
+
+    def __init__(self, response_times):
+        self.response_times = iter(response_times)
+
+    def __call__(self, rng, target):
+        if not self.harness.widget.stage.is_test:
+            return PRACTICE_RESPONSE if target else None
+        return next(self.response_times)
+
+
+def replay(path):
+    session = LoggedSession(path)
+    paradigm = ReplayParadigm(paradigm_path(session.fields["paradigm"]), session)
+    responder = ReplayResponder(session.response_times())
+    harness = Harness(paradigm, responder)
+    # Presses land at the logged offset from the painted onset, and late presses during the blank are kept.
+    harness.onset_relative = True
+    harness.response_window = float("inf")
+    responder.harness = harness
+    harness.run()
+
+    summary = harness.widget.session_summary
+    rt_error = [abs((summary.records.response[i] - summary.records.onset[i]) -
+                    (session.responses[i] - session.onsets[i])) / 1e6
+                for i in range(min(summary.total, len(session.responses)))
+                if session.responses[i] and summary.records.response[i]]
+    result = metadata(summary, session=session.fields["session"], paradigm=paradigm.name, seed=session.seed)
+    result.update({
+        "sequence": {None: "unseeded", True: "match", False: "differs"}[paradigm.sequence_match],
+        "changed": sum(outcome != summary.records[i][1] for i, outcome in enumerate(session.outcomes)),
+        "rt_error_max": max(rt_error, default=0.0),
+    })
+    harness.widget.close()
+    harness.widget.deleteLater()
+    return result
+
+
+def indexed_paths(index_path, paradigm=None, participant=None, since=None):
+    index = SessionIndex(index_path)
+    sessions = index.sessions(paradigm, participant, since)
+    index.close()
+    # Recovered sessions keep only the rows that reached the disk, with no stimuli or blocks to replay.
+    return [session["data_path"] for session in sessions if session["status"] == "complete" and session["data_path"]
+            and os.path.exists(session["data_path"])]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay logged sessions through the paradigm and re-score them")
+    parser.add_argument("paths", nargs="*", help="exported session data (.npz or .trials.parquet)")
+    parser.add_argument("--index", help="replay every session in this session index")
+    parser.add_argument("--paradigm")
+    parser.add_argument("--participant")
+    parser.add_argument("--since")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])  # noqa: F841
+    paths = args.paths + (indexed_paths(args.index, args.paradigm, args.participant, args.since) if args.index else [])
+    print(",".join(REPORT_FIELDS))
+    for path in paths:
+        try:
+            result = replay(path)
+        except Exception as e:
+            # One unreadable or mismatched session is reported in its row and does not end the run.
+            result = {"session": os.path.basename(path), "error": str(e).replace(",", ";")}
+        print(",".join("" if result.get(field) is None else str(result[field]) for field in REPORT_FIELDS), flush=True)
+
+
+if __name__ == "__main__":
+    main()
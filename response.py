@@ -0,0 +1,142 @@
+import os
+import sys
+import threading
+
+from PySide6.QtCore import QObject, QEvent, Signal, Qt
+from PySide6.QtWidgets import QAbstractSpinBox, QApplication, QLineEdit, QPlainTextEdit, QTextEdit
+
+from timing import now
+
+KEY_SOURCE = "key"
+BOX_SOURCE = "box"
+DEBOUNCE = int(os.environ.get("PARADIGM_DEBOUNCE", 30))
+RESPONSE_BOX = sys.argv[sys.argv.index("--response-box") + 1] if "--response-box" in sys.argv[:-1] else \
+    os.environ.get("PARADIGM_RESPONSE_BOX")
+BAUD_RATE = int(os.environ.get("PARADIGM_RESPONSE_BAUD", 115200))
+POLL_INTERVAL = 0.1
+TEXT_INPUTS = (QLineEdit, QTextEdit, QPlainTextEdit, QAbstractSpinBox)
+
+
+class SerialBox(QObject):
+    received = Signal(object, str)
+    failed = Signal(str)
+
+    def __init__(self, path, baud_rate=BAUD_RATE, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.baud_rate = baud_rate
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name=f"response-box-{os.path.basename(path)}", daemon=True)
+        self.thread.start()
+
+    def open(self):
+        # Each reader blocks for at most POLL_INTERVAL and returns b"" when nothing arrived, so stop() is noticed.
+        try:
+            import serial
+        except ImportError:
+            if os.name != "posix":
+                raise
+            return self.open_tty()
+
+        port = serial.Serial(self.path, self.baud_rate, timeout=POLL_INTERVAL)
+
+        def read():
+            data = port.read(1)
+            return data + port.read(port.in_waiting) if data else data
+        return read, port.close
+
+    def open_tty(self):
+        import select
+        import termios
+        import tty
+
+        fd = os.open(self.path, os.O_RDONLY | os.O_NOCTTY | os.O_NONBLOCK)
+        if os.isatty(fd):
+            tty.setraw(fd)
+            speed = getattr(termios, f"B{self.baud_rate}", None)
+            if speed is not None:
+                attributes = termios.tcgetattr(fd)
+                attributes[4] = attributes[5] = speed
+                termios.tcsetattr(fd, termios.TCSANOW, attributes)
+
+        def read():
+            if not select.select([fd], [], [], POLL_INTERVAL)[0]:
+                return b""
+            try:
+                return os.read(fd, 64)
+            except BlockingIOError:
+                return b""
+        return read, lambda: os.close(fd)
+
+    def fail(self, action, error):
+        message = f"response box {self.path}: could not {action}: {error}"
+        print(message, file=sys.stderr)
+        self.failed.emit(message)
+
+    def run(self):
+        try:
+            read, close = self.open()
+        except (ImportError, OSError) as e:
+            self.fail("open", e)
+            return
+        try:
+            while self.running:
+                data = read()
+                # Stamped as soon as the read returns, which is as close to arrival as this thread can see it.
+                press_time = now()
+                for code in data:
+                    self.received.emit(press_time, f"{BOX_SOURCE}{code}")
+        except OSError as e:
+            self.fail("read", e)
+        finally:
+            close()
+
+    def stop(self):
+        self.running = False
+        self.thread.join(POLL_INTERVAL * 2)
+
+
+class ResponseInput(QObject):
+    pressed = Signal(object, str, bool)
+    failed = Signal(str)
+
+    def __init__(self, parent, keys=(Qt.Key.Key_Space,), debounce=DEBOUNCE, box=RESPONSE_BOX):
+        super().__init__(parent)
+        self.keys = set(keys)
+        self.debounce = debounce * 1_000_000
+        self.offset = None
+        self.last = {}
+
+        self.box = SerialBox(box, parent=self) if box else None
+        if self.box:
+            self.box.received.connect(self.receive)
+            self.box.failed.connect(self.failed)
+        QApplication.instance().installEventFilter(self)
+
+    def eventFilter(self, watched, event):
+        if event.type() in (QEvent.Type.KeyPress, QEvent.Type.KeyRelease) and event.key() in self.keys \
+                and self.parent().isVisible() and not isinstance(QApplication.focusWidget(), TEXT_INPUTS):
+            if event.type() == QEvent.Type.KeyPress and not event.isAutoRepeat():
+                self.receive(self.stamp(event.timestamp(), now()), KEY_SOURCE)
+            # Swallow the key so a focused button cannot turn it into a second, delayed click. Keys typed into an
+            # editor, such as the results filter, are text and never responses.
+            return True
+        return super().eventFilter(watched, event)
+
+    def stamp(self, timestamp, receipt_time):
+        if not timestamp:
+            return receipt_time
+        offset = receipt_time - timestamp * 1_000_000
+        if self.offset is None or offset < self.offset:
+            self.offset = offset
+        return timestamp * 1_000_000 + self.offset
+
+    def receive(self, press_time, source):
+        last = self.last.get(source)
+        self.last[source] = press_time
+        self.pressed.emit(press_time, source, last is not None and press_time - last < self.debounce)
+
+    def close(self):
+        QApplication.instance().removeEventFilter(self)
+        if self.box:
+            self.box.stop()
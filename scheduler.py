@@ -0,0 +1,170 @@
+import os
+import sys
+
+from PySide6.QtCore import QObject, QTimer, QEvent, Qt
+
+from timing import now
+
+FRAME_MODE = "--frames" in sys.argv or bool(os.environ.get("PARADIGM_FRAME_MODE"))
+DEFAULT_RATE = 60.0
+
+
+class DeadlineScheduler(QObject):
+    on_fire = None
+
+    def __init__(self, parent=None, clock=now):
+        super().__init__(parent)
+        self.clock = clock
+        self.origin = clock()
+        self.deadline = 0
+        self.callback = None
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.timeout.connect(self.__fire)
+
+    @property
+    def elapsed(self):
+        return self.clock() - self.origin
+
+    def start(self):
+        self.timer.stop()
+        self.callback = None
+        self.origin = self.clock()
+        self.deadline = 0
+
+    def stop(self):
+        self.timer.stop()
+        self.callback = None
+
+    def after(self, delay, callback):
+        self.deadline += delay * 1_000_000
+        self.callback = callback
+        remaining = self.deadline - self.elapsed
+        self.timer.start(max(0, -(-remaining // 1_000_000)))
+
+    def mark(self):
+        return self.deadline / 1_000_000, self.elapsed / 1_000_000
+
+    def take_frames(self):
+        return (), 0
+
+    def __fire(self):
+        callback, self.callback = self.callback, None
+        if callback:
+            if self.on_fire:
+                self.on_fire(self.elapsed - self.deadline)
+            callback()
+
+
+class FrameScheduler(QObject):
+    on_fire = None
+
+    def __init__(self, parent, clock=now):
+        super().__init__(parent)
+        self.clock = clock
+        self.window = None
+        self.period = 1e9 / DEFAULT_RATE
+        self.running = False
+
+        self.frame = -1
+        self.frame_time = 0
+        self.origin = clock()
+        self.deadline = 0
+        self.callback = None
+
+        self.flips = []
+        self.dropped = 0
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.timeout.connect(self.__fire)
+
+    @property
+    def elapsed(self):
+        return self.clock() - self.origin
+
+    def frames(self, delay):
+        return max(1, round(delay * 1_000_000 / self.period))
+
+    def attach(self):
+        window = self.parent().window().windowHandle()
+        if window is not self.window:
+            if self.window is not None:
+                self.window.removeEventFilter(self)
+            self.window = window
+            if window is not None:
+                window.installEventFilter(self)
+                rate = window.screen().refreshRate() if window.screen() else 0
+                self.period = 1e9 / (rate or DEFAULT_RATE)
+        return window
+
+    def start(self):
+        self.timer.stop()
+        self.callback = None
+        self.running = self.attach() is not None
+        self.frame_time = 0
+        self.origin = self.clock()
+        self.frame = -1
+        self.deadline = 0
+        self.flips = []
+        self.dropped = 0
+        if self.running:
+            self.window.requestUpdate()
+
+    def stop(self):
+        self.timer.stop()
+        self.callback = None
+        self.running = False
+
+    def after(self, delay, callback):
+        self.deadline += self.frames(delay)
+        self.callback = callback
+        if not self.running:
+            # Without an exposed window there are no frames to count, so fall back to a timer.
+            remaining = self.deadline * self.period - self.elapsed
+            self.timer.start(max(0, round(remaining / 1_000_000)))
+
+    def mark(self):
+        return self.deadline * self.period / 1_000_000, self.elapsed / 1_000_000
+
+    def take_frames(self):
+        flips, dropped = self.flips, self.dropped
+        self.flips = []
+        self.dropped = 0
+        return flips, dropped
+
+    def tick(self, timestamp):
+        # Frames are counted on a refresh-period grid anchored at the first frame, so update requests
+        # that arrive faster than the display refreshes do not advance the count.
+        if not self.frame_time:
+            self.frame_time = timestamp
+        frame = round((timestamp - self.frame_time) / self.period)
+        if frame <= self.frame:
+            return
+        if self.frame >= 0:
+            self.dropped += frame - self.frame - 1
+        self.frame = frame
+        if self.callback and self.frame >= self.deadline:
+            self.flips.append((self.frame, timestamp - self.origin))
+            self.__fire()
+
+    def eventFilter(self, watched, event):
+        if watched is self.window and event.type() == QEvent.Type.UpdateRequest and self.running:
+            self.tick(self.clock())
+            if self.running:
+                self.window.requestUpdate()
+        return super().eventFilter(watched, event)
+
+    def __fire(self):
+        callback, self.callback = self.callback, None
+        if callback:
+            if self.on_fire:
+                self.on_fire(self.elapsed - round(self.deadline * self.period))
+            callback()
+
+
+def make_scheduler(parent):
+    return FrameScheduler(parent) if FRAME_MODE else DeadlineScheduler(parent)
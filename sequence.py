@@ -0,0 +1,125 @@
+import random
+
+FILLER = 0
+TARGET = 1
+LURE = 2
+
+
+def lure_lags(back):
+    return [lag for lag in (back - 1, back + 1) if lag > 0]
+
+
+class NBackWindow:
+    # The last back + 1 letters in a ring, which covers the target lag and both lure lags. Counts of the letters in the
+    # ring let a letter that is nowhere in it classify without looking at any lag.
+    def __init__(self, back):
+        self.back = back
+        self.lags = [back] + lure_lags(back)
+        self.size = back + 1
+        self.ring = [None] * self.size
+        self.counts = {}
+        self.position = 0
+
+    def at(self, lag):
+        return self.ring[(self.position - lag) % self.size] if lag <= self.position else None
+
+    def classify(self, letter):
+        if not self.counts.get(letter):
+            return FILLER
+        if self.at(self.back) == letter:
+            return TARGET
+        if any(self.at(lag) == letter for lag in self.lags[1:]):
+            return LURE
+        return FILLER
+
+    def blocks(self, letter):
+        return bool(self.counts.get(letter)) and any(self.at(lag) == letter for lag in [1] + self.lags)
+
+    def push(self, letter):
+        index = self.position % self.size
+        if self.position >= self.size:
+            self.counts[self.ring[index]] -= 1
+        self.ring[index] = letter
+        self.counts[letter] = self.counts.get(letter, 0) + 1
+        self.position += 1
+
+
+def classify(sequence, back):
+    window = NBackWindow(back)
+    kinds = []
+    for letter in sequence:
+        kinds.append(window.classify(letter))
+        window.push(letter)
+    return kinds
+
+
+def classify_streams(trials, back):
+    windows = [NBackWindow(back) for _ in trials[0]] if trials else []
+    kinds = []
+    for trial in trials:
+        kinds.append(tuple(window.classify(item) for window, item in zip(windows, trial)))
+        for window, item in zip(windows, trial):
+            window.push(item)
+    return kinds
+
+
+def validate(sequence, back, targets, lures=0):
+    kinds = classify(sequence, back)
+    return kinds.count(TARGET) == targets and kinds.count(LURE) == lures
+
+
+def anchor(position, back):
+    if back == 1:
+        return position - 1, 2
+    return position - back + 1, back - 1
+
+
+def place(length, back, targets, lures, rng):
+    if targets > length - back:
+        raise ValueError(f"{targets} targets do not fit in {length} turns of {back}-back")
+    kinds = [FILLER] * length
+    for position in rng.sample(range(back, length), targets):
+        kinds[position] = TARGET
+    if not lures:
+        return kinds
+
+    anchors = set()
+    candidates = list(range(2 if back == 1 else back - 1, length))
+    rng.shuffle(candidates)
+    for position in candidates:
+        if lures == 0:
+            break
+        base, _ = anchor(position, back)
+        if kinds[position] != FILLER or kinds[base] != FILLER or position in anchors:
+            continue
+        kinds[position] = LURE
+        anchors.add(base)
+        lures -= 1
+    if lures:
+        raise ValueError(f"could not place {lures} more lures in {length} turns of {back}-back")
+    return kinds
+
+
+def n_back_sequence(letters, length, back, targets, lures=0, rng=random):
+    letters = sorted(set(letters))
+    if len(letters) <= len({1, back, *lure_lags(back)}):
+        raise ValueError(f"{len(letters)} letters are too few for {back}-back without accidental matches")
+
+    sequence = []
+    window = NBackWindow(back)
+    for i, kind in enumerate(place(length, back, targets, lures, rng)):
+        if kind == TARGET:
+            letter = window.at(back)
+        elif kind == LURE:
+            letter = window.at(anchor(i, back)[1])
+        else:
+            letter = rng.choice([letter for letter in letters if not window.blocks(letter)])
+        sequence.append(letter)
+        window.push(letter)
+    return sequence
+
+
+def dual_n_back_sequence(visual, auditory, length, back, targets, lures=0, rng=random):
+    # The streams are placed independently, so a match in one says nothing about the other.
+    return list(zip(n_back_sequence(visual, length, back, targets, lures, rng),
+                    n_back_sequence(auditory, length, back, targets, lures, rng)))
@@ -0,0 +1,125 @@
+import argparse
+import gc
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QEvent, QObject
+from PySide6.QtWidgets import QApplication
+
+from benchmark import Harness, PARADIGMS, RESPONDERS
+from paradigm import Paradigm
+
+WARM_UP = 5
+RSS_BUDGET = 32.0
+OBJECT_BUDGET = 20000
+QT_BUDGET = 50
+HANDLE_BUDGET = 4
+TOP_ALLOCATORS = 5
+SAMPLE_TEMPLATE = ("{paradigm} session {session}: rss {rss:.1f}MB objects {objects} qt {qt} handles {handles} "
+                   "traced {traced:.1f}MB in {wall:.2f}s")
+
+
+def rss():
+    try:
+        import psutil
+    except ImportError:
+        with open("/proc/self/status") as f:
+            return next(int(line.split()[1]) for line in f if line.startswith("VmRSS:")) / 1024
+    return psutil.Process().memory_info().rss / 2 ** 20
+
+
+def handles():
+    try:
+        import psutil
+    except ImportError:
+        return len(os.listdir("/proc/self/fd"))
+    process = psutil.Process()
+    return process.num_handles() if sys.platform == "win32" else process.num_fds()
+
+
+def qt_objects():
+    app = QApplication.instance()
+    return len(app.findChildren(QObject)) + sum(len(widget.findChildren(QObject)) + 1
+                                                for widget in app.topLevelWidgets())
+
+
+def settle():
+    # Exports finish on the writer threads and deleteLater needs the loop, so let both drain before sampling.
+    for thread in threading.enumerate():
+        if thread.name.startswith("writer-"):
+            thread.join()
+    QApplication.processEvents()
+    QApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+    gc.collect()
+
+
+def sample(paradigm, session, wall):
+    settle()
+    return {"paradigm": paradigm, "session": session, "rss": rss(), "objects": len(gc.get_objects()),
+            "qt": qt_objects(), "handles": handles(), "traced": tracemalloc.get_traced_memory()[0] / 2 ** 20,
+            "wall": wall}
+
+
+def soak(paradigm, sessions, responder="random", seed=0):
+    harness = Harness(Paradigm(PARADIGMS[paradigm]), RESPONDERS[responder], seed)
+    samples, baseline = [], None
+    for session in range(1, sessions + 1):
+        # The harness keeps per-trial bookkeeping for its own report; a soak only needs the widget to keep running.
+        harness.trials = []
+        harness.updates = []
+        start_time = time.perf_counter()
+        harness.run()
+        wall = time.perf_counter() - start_time
+        if session == WARM_UP:
+            baseline = tracemalloc.take_snapshot()
+        samples.append(sample(paradigm, session, wall))
+        print(SAMPLE_TEMPLATE.format(**samples[-1]), flush=True)
+    harness.widget.close()
+    harness.widget.deleteLater()
+    return samples, baseline
+
+
+def growth(samples):
+    # Measured from the first session after the tracemalloc baseline, whose snapshot skews the sample it lands in.
+    first, last = samples[min(WARM_UP, len(samples) - 1)], samples[-1]
+    return {key: last[key] - first[key] for key in ("rss", "objects", "qt", "handles")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run many consecutive sessions and fail on resource growth")
+    parser.add_argument("--paradigm", choices=list(PARADIGMS), action="append")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--responder", choices=list(RESPONDERS), default="random")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rss-budget", type=float, default=RSS_BUDGET, help="MB of RSS growth after warm-up")
+    parser.add_argument("--object-budget", type=int, default=OBJECT_BUDGET)
+    parser.add_argument("--qt-budget", type=int, default=QT_BUDGET)
+    parser.add_argument("--handle-budget", type=int, default=HANDLE_BUDGET)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])  # noqa: F841
+    tracemalloc.start()
+    budgets = {"rss": args.rss_budget, "objects": args.object_budget, "qt": args.qt_budget,
+               "handles": args.handle_budget}
+    failed = False
+    for paradigm in args.paradigm or PARADIGMS:
+        samples, baseline = soak(paradigm, args.sessions, args.responder, args.seed)
+        grown = growth(samples)
+        over = [key for key, budget in budgets.items() if grown[key] > budget]
+        print(f"{paradigm} growth after warm-up: rss {grown['rss']:+.1f}MB objects {grown['objects']:+d} "
+              f"qt {grown['qt']:+d} handles {grown['handles']:+d}" + (f" OVER BUDGET: {', '.join(over)}" if over
+                                                                         else ""))
+        if baseline:
+            for stat in tracemalloc.take_snapshot().compare_to(baseline, "lineno")[:TOP_ALLOCATORS]:
+                print(f"  {stat}")
+        failed = failed or bool(over)
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import os
+
+from PySide6.QtGui import QImage, QPixmap, Qt
+
+from bundle import asset_bundle, key
+
+
+class StimulusCache:
+    def __init__(self, bundled=True):
+        self.bundled = bundled
+        self.images = {}
+        self.pixmaps = {}
+        self.sizes = {}
+
+        self.hit_count = 0
+        self.miss_count = 0
+
+    @property
+    def bundle(self):
+        return asset_bundle() if self.bundled else None
+
+    def load(self, folder):
+        # Every path is keyed the way the bundle keys it, so a path joined with backslashes on Windows finds the same
+        # images and pixmaps as the forward-slash path returned here.
+        if self.bundle and self.bundle.has_folder(folder):
+            paths = self.bundle.paths(folder)
+            for path in paths:
+                if path not in self.images:
+                    self.images[path] = self.bundle.image(path)
+            return paths
+        paths = []
+        for file in sorted(os.listdir(folder)):
+            path = key(os.path.join(folder, file))
+            if path not in self.images:
+                self.images[path] = QImage(path)
+            paths.append(path)
+        return paths
+
+    def scale(self, path, size):
+        width, height, ratio = size
+        # Bundled images come pre-decoded at standard heights; scale down from the nearest one that is large enough.
+        source = self.bundle.image(path, round(height * ratio)) if self.bundle and path in self.bundle \
+            else self.images[path]
+        pix_map = QPixmap.fromImage(source.scaled(
+            max(1, round(width * ratio)), max(1, round(height * ratio)),
+            Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation
+        ))
+        pix_map.setDevicePixelRatio(ratio)
+        return pix_map
+
+    def rescale(self, paths, width, height, ratio):
+        size = (width, height, ratio)
+        for path in map(key, paths):
+            if self.sizes.get(path) == size:
+                continue
+            self.pixmaps.pop((path, self.sizes.get(path)), None)
+            self.pixmaps[(path, size)] = self.scale(path, size)
+            self.sizes[path] = size
+
+    def pixmap(self, path, width, height, ratio):
+        path = key(path)
+        size = (width, height, ratio)
+        if pix_map := self.pixmaps.get((path, size)):
+            self.hit_count += 1
+            return pix_map
+        self.miss_count += 1
+        if path not in self.images:
+            self.images[path] = QImage(path)
+        self.rescale([path], width, height, ratio)
+        return self.pixmaps[(path, size)]
+
+    @property
+    def report(self):
+        report = f"stimulus_cache hit: {self.hit_count} miss: {self.miss_count}"
+        return f"{report} bundle: {self.bundle.digest}" if self.bundle else report
+
+
+STIMULUS_CACHE = StimulusCache()
@@ -0,0 +1,231 @@
+import array
+import datetime
+import math
+
+from timing import now
+
+RESULTS = ["correct", "wrong", "miss", "pass"]
+RESULT_CODES = {result: code for code, result in enumerate(RESULTS)}
+CORRECT, WRONG, MISS, PASS = range(len(RESULTS))
+
+COLUMNS = {
+    "outcome": "b",
+    "rt": "i",
+    "stimulus": "h",
+    "step": "b",
+    "block": "h",
+    "epoch": "h",
+    "onset": "q",
+    "response": "q",
+}
+
+
+class TrialStore:
+    __slots__ = tuple(COLUMNS) + ("stimuli", "steps", "stimulus_ids", "step_ids")
+
+    def __init__(self):
+        for name, typecode in COLUMNS.items():
+            setattr(self, name, array.array(typecode))
+        self.stimuli = []
+        self.steps = []
+        self.stimulus_ids = {}
+        self.step_ids = {}
+
+    def __len__(self):
+        return len(self.outcome)
+
+    def __getitem__(self, i):
+        return (self.rt[i] // 1000, RESULTS[self.outcome[i]], self.steps[self.step[i]], self.onset[i],
+                self.response[i])
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    @staticmethod
+    def intern(names, ids, name):
+        if name not in ids:
+            ids[name] = len(names)
+            names.append(name)
+        return ids[name]
+
+    def append(self, outcome, rt, stimulus, step, block, epoch, onset=0, response=0):
+        self.outcome.append(outcome)
+        self.rt.append(rt)
+        self.stimulus.append(self.intern(self.stimuli, self.stimulus_ids, stimulus))
+        self.step.append(self.intern(self.steps, self.step_ids, step))
+        self.block.append(block)
+        self.epoch.append(epoch)
+        self.onset.append(onset)
+        self.response.append(response)
+
+    def matcher(self, pattern):
+        # Names are matched once per code, so a row costs a few lookups; only a pattern of digits can match a number.
+        outcomes = [pattern in result for result in RESULTS]
+        steps = {}
+        numeric = pattern.isdigit()
+
+        def match(i):
+            step = self.step[i]
+            if step not in steps:
+                steps[step] = pattern in self.steps[step]
+            return outcomes[self.outcome[i]] or steps[step] or numeric and (
+                pattern in str(self.rt[i] // 1000) or pattern in str(self.onset[i]) or pattern in str(self.response[i]))
+        return match
+
+    def numpy(self):
+        # Views share memory with the arrays, which cannot grow while a view is alive.
+        import numpy as np
+
+        return {name: np.frombuffer(getattr(self, name), dtype=typecode) for name, typecode in COLUMNS.items()}
+
+
+class Summary:
+    __slots__ = ("show_time", "ready_time", "timeline", "events", "records", "start_time", "writer", "written",
+                 "counts", "block", "epoch", "epochs", "rt_count", "rt_mean", "rt_m2")
+
+    def __init__(self, show_time=0, ready_time=0):
+        self.show_time = show_time
+        self.ready_time = ready_time
+        self.timeline = []
+        self.events = []
+        self.records = TrialStore()
+        self.start_time = 0
+        self.writer = None
+        self.written = 0
+
+        self.counts = [0] * len(RESULTS)
+        self.block = 0
+        self.epoch = 0
+        self.epochs = {}
+
+        self.rt_count = 0
+        self.rt_mean = 0.0
+        self.rt_m2 = 0.0
+
+    @property
+    def total(self):
+        return len(self.records)
+
+    @property
+    def correct_count(self):
+        return self.counts[CORRECT]
+
+    @property
+    def wrong_count(self):
+        return self.counts[WRONG]
+
+    @property
+    def miss_count(self):
+        return self.counts[MISS]
+
+    @property
+    def pass_count(self):
+        return self.counts[PASS]
+
+    @property
+    def rt_variance(self):
+        return self.rt_m2 / (self.rt_count - 1) if self.rt_count > 1 else 0.0
+
+    def stream(self, writer):
+        self.writer = writer
+        for line in self.timeline:
+            writer.write_line(line)
+
+    def log(self, line):
+        self.timeline.append(line)
+        if self.writer:
+            self.writer.write_line(line)
+
+    def event(self, kind, step, frame=-1, planned=math.nan, actual=math.nan):
+        self.events.append((now(), kind, step, frame, planned, actual))
+
+    def flush(self):
+        if not self.writer:
+            return
+        for i in range(self.written, self.total):
+            self.writer.write_row((i + 1,) + self.records[i])
+        self.written = self.total
+
+    def close(self, footer, finish=None):
+        self.flush()
+        if self.writer:
+            self.writer.close(footer, finish)
+            self.writer = None
+
+    def abandon(self):
+        self.flush()
+        if self.writer:
+            self.writer.abandon()
+            self.writer = None
+
+    def add_rt(self, rt):
+        self.rt_count += 1
+        delta = rt / 1000 - self.rt_mean
+        self.rt_mean += delta / self.rt_count
+        self.rt_m2 += delta * (rt / 1000 - self.rt_mean)
+
+    def restore(self, elapse, result, step, onset=0, response=0):
+        outcome = RESULT_CODES[result]
+        self.records.append(outcome, int(elapse) * 1000, "", step, self.block, self.epoch, int(onset), int(response))
+        self.counts[outcome] += 1
+        if outcome in (CORRECT, WRONG):
+            self.add_rt(int(elapse) * 1000)
+
+    def record_start(self, step):
+        self.block += 1
+        self.epoch = self.epochs[step] = self.epochs.get(step, 0) + 1
+        self.event("start", step)
+        timestamp = datetime.datetime.now() + datetime.timedelta(seconds=self.ready_time / 1000)
+        timestamp = timestamp.strftime("%Y-%m-%d-%H-%M-%S")
+        self.log(f"{step} start_time: {timestamp}")
+
+    def record_end(self, step, flips=(), dropped=0):
+        for frame, flip_time in flips:
+            self.event("flip", step, frame, actual=flip_time / 1_000_000)
+            self.log(f"{step} flip frame: {frame} time: {flip_time / 1_000_000:.3f}")
+        if flips:
+            self.event("dropped", step, dropped)
+            self.log(f"{step} dropped frames: {dropped}")
+        self.event("end", step)
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
+        self.log(f"{step} end_time: {timestamp}")
+        self.flush()
+        if self.writer:
+            self.writer.sync()
+
+    def record_press(self, step, press_time, source, status):
+        # Every press lands in the event table, including the ones that never reach a trial.
+        self.events.append((press_time, status, step, self.total, math.nan, math.nan))
+        self.log(f"{step} turn {self.total} {status} source: {source} time: {press_time / 1_000_000:.3f}")
+
+    def record_onset(self, step, planned, actual):
+        self.event("onset", step, self.total, planned, actual)
+        self.log(f"{step} turn {self.total} onset planned: {planned:.3f} actual: {actual:.3f} "
+                 f"late: {actual - planned:.3f}")
+
+    def record(self, correct, step, response_time=0, stimulus=""):
+        if correct in ("miss", "pass"):
+            self.flush()
+            self.start_time = now()
+            outcome = RESULT_CODES[correct]
+            self.records.append(outcome, self.show_time * 1000, stimulus, step, self.block, self.epoch,
+                                self.start_time)
+            self.counts[outcome] += 1
+            return
+
+        # A response turns the pending miss into a hit, or the pending pass into a false alarm.
+        outcome, pending = (CORRECT, MISS) if correct else (WRONG, PASS)
+        response_time = response_time or now()
+        rt = (response_time - self.start_time) // 1000
+        self.records.outcome[-1] = outcome
+        self.records.rt[-1] = rt
+        self.records.response[-1] = response_time
+        self.counts[outcome] += 1
+        self.counts[pending] -= 1
+        self.add_rt(rt)
+
+    def record_paint(self, onset_time):
+        if not self.total or self.records.response[-1]:
+            return
+        self.start_time = onset_time
+        self.records.onset[-1] = onset_time
@@ -0,0 +1,162 @@
+import bisect
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, QTimer, Qt
+from PySide6.QtWidgets import QTableView, QAbstractItemView, QHeaderView, QLineEdit, QVBoxLayout, QWidget
+
+ROW_HEIGHT = 24
+FILTER_TEXT = "筛选"
+FILTER_DELAY = 250
+
+
+class RecordModel(QAbstractTableModel):
+    def __init__(self, headers, parent=None):
+        super().__init__(parent)
+        self.headers = headers
+        self.records = []
+        self.rows = []
+        self.known = 0
+
+        self.sort_column = -1
+        self.sort_order = Qt.SortOrder.AscendingOrder
+        self.pattern = ""
+        self.match = None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.headers[section]
+        return None
+
+    def value(self, i, column):
+        return i + 1 if column == 0 else self.records[i][column - 1]
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        return self.value(self.rows[index.row()], index.column())
+
+    def matcher(self, pattern):
+        if not hasattr(self.records, "matcher"):
+            return lambda i: any(pattern in str(self.value(i, column)) for column in range(len(self.headers)))
+        match = self.records.matcher(pattern)
+        # The turn column is the row number, which the records do not hold.
+        return lambda i: match(i) or pattern.isdigit() and pattern in str(i + 1)
+
+    def accept(self, i):
+        return not self.pattern or self.match(i)
+
+    def arrange(self):
+        rows = [i for i in range(len(self.records)) if self.accept(i)]
+        if self.sort_column >= 0:
+            column = self.sort_column
+            rows.sort(key=lambda i: self.value(i, column), reverse=self.sort_order == Qt.SortOrder.DescendingOrder)
+        return rows
+
+    def row(self, i):
+        if self.sort_column < 0:
+            row = bisect.bisect_left(self.rows, i)
+            return row if row < len(self.rows) and self.rows[row] == i else None
+        try:
+            return self.rows.index(i)
+        except ValueError:
+            return None
+
+    def position(self, i):
+        # Binary search consistent with arrange(): equal keys keep record order in both directions.
+        if self.sort_column < 0:
+            return bisect.bisect(self.rows, i)
+        key = self.value(i, self.sort_column)
+        descending = self.sort_order == Qt.SortOrder.DescendingOrder
+        low, high = 0, len(self.rows)
+        while low < high:
+            middle = (low + high) // 2
+            other = self.value(self.rows[middle], self.sort_column)
+            if (key > other) if descending else (key < other):
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    def set_records(self, records):
+        self.beginResetModel()
+        self.records = records
+        self.known = len(records)
+        self.match = self.matcher(self.pattern)
+        self.rows = self.arrange()
+        self.endResetModel()
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.beginResetModel()
+        self.sort_column = column
+        self.sort_order = order
+        self.rows = self.arrange()
+        self.endResetModel()
+
+    def filter(self, pattern):
+        self.beginResetModel()
+        self.pattern = pattern
+        self.match = self.matcher(pattern)
+        self.rows = self.arrange()
+        self.endResetModel()
+
+    def update(self, i, known=True):
+        row = self.row(i) if known else None
+        if row is not None:
+            del self.rows[row]
+        position = self.position(i) if self.accept(i) else None
+        if row is not None:
+            self.rows.insert(row, i)
+            if position == row:
+                self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.headers) - 1))
+                return
+            # Its sort key or filter match changed, so the row moves.
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self.rows[row]
+            self.endRemoveRows()
+        if position is not None:
+            self.beginInsertRows(QModelIndex(), position, position)
+            self.rows.insert(position, i)
+            self.endInsertRows()
+
+    def refresh(self):
+        # Only the newest record changes during a trial; every earlier one is final.
+        if self.known:
+            self.update(self.known - 1)
+        while self.known < len(self.records):
+            self.known += 1
+            self.update(self.known - 1, False)
+
+
+class RecordTable(QWidget):
+    def __init__(self, headers):
+        super().__init__()
+        self.record_model = RecordModel(headers, self)
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText(FILTER_TEXT)
+        self.filter_edit.setClearButtonEnabled(True)
+        # Filtering re-reads every record, so it waits until typing pauses rather than running on each keystroke.
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(FILTER_DELAY)
+        self.filter_timer.timeout.connect(lambda: self.record_model.filter(self.filter_edit.text()))
+        self.filter_edit.textChanged.connect(self.filter_timer.start)
+        self.view = QTableView()
+        self.view.setModel(self.record_model)
+
+        self.view.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.view.setSortingEnabled(True)
+        self.view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.view.verticalHeader().setDefaultSectionSize(ROW_HEIGHT)
+        self.view.verticalHeader().setVisible(False)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.filter_edit)
+        layout.addWidget(self.view)
@@ -0,0 +1,23 @@
+import numpy as np
+
+import analysis
+from plan import step_turns
+
+
+def test_step_turns_follow_the_test_stages():
+    config = {"stages": [
+        {"kind": "practice", "turns": 20, "blocks": [{"step": "a"}]},
+        {"kind": "test", "turns": 12, "blocks": [{"step": "b"}, {"step": "b"}]},
+        {"kind": "test", "turns": 8, "blocks": [{"step": "a"}]},
+    ]}
+    assert step_turns(config) == (["b", "a"], [12, 8])
+    assert analysis.PARADIGMS["Go-no_go"] == (["go", "no_go"], [24, 24])
+
+
+def test_epochs_count_blocks_of_each_step():
+    lines = ["Turn,Elapse,Result,Step,Onset,Response"] + [f"{i + 1},0,miss,{step},0,0" for i, step
+                                                          in enumerate(["a"] * 5 + ["b"] * 5)]
+    _, _, steps, epochs = analysis.parse_lines(lines, ["a", "b"], [2, 3])
+    assert steps.tolist() == [0] * 5 + [1] * 5
+    assert epochs.tolist() == [0, 0, 1, 1, 2, 0, 0, 0, 1, 1]
+    assert epochs.dtype == np.int16
@@ -0,0 +1,60 @@
+import wave
+
+from PySide6.QtGui import QColor, QImage
+
+from bundle import IMAGE_FORMAT, AssetBundle, build, key
+
+
+def make_assets(folder):
+    folder.mkdir()
+    image = QImage(1200, 800, QImage.Format.Format_RGB32)
+    image.fill(QColor("orange"))
+    image.save(str(folder / "a.png"))
+    with wave.open(str(folder / "b.wav"), "wb") as audio:
+        audio.setnchannels(1)
+        audio.setsampwidth(2)
+        audio.setframerate(8000)
+        audio.writeframes(bytes(range(256)) * 4)
+    return str(folder / "a.png"), str(folder / "b.wav")
+
+
+def test_bundle_round_trip(app, tmp_path):
+    image_path, audio_path = make_assets(tmp_path / "assets")
+    output = str(tmp_path / "stimuli.bundle")
+    build([str(tmp_path / "assets")], output)
+
+    bundle = AssetBundle(output)
+    try:
+        assert bundle.has_folder(str(tmp_path / "assets")) and image_path in bundle
+        assert bundle.paths(str(tmp_path / "assets")) == [key(image_path), key(audio_path)]
+        assert bundle.image(image_path) == QImage(image_path).convertToFormat(IMAGE_FORMAT)
+        # The smallest standard height at least as tall as asked for; the original when none is.
+        assert bundle.image(image_path, 500).height() == 540
+        assert bundle.image(image_path, 1000).height() == 800
+        frames, *layout = bundle.audio(audio_path)
+        assert (bytes(frames), *layout) == (bytes(range(256)) * 4, 1, 8000, 2)
+        # Payloads are views into the mapping, which cannot close while one is alive.
+        frames.release()
+        assert bundle.verify() == [] and bundle.stale() == []
+        with open(audio_path, "ab") as f:
+            f.write(b"\0\0")
+        assert bundle.stale() == [key(audio_path)]
+    finally:
+        bundle.close()
+
+
+def test_verify_finds_damaged_payloads(app, tmp_path):
+    _, audio_path = make_assets(tmp_path / "assets")
+    output = str(tmp_path / "stimuli.bundle")
+    build([str(tmp_path / "assets")], output)
+    # The audio is the last payload, so the last byte of the file is one of its samples.
+    with open(output, "r+b") as f:
+        f.seek(-1, 2)
+        last = f.read(1)
+        f.seek(-1, 2)
+        f.write(bytes([last[0] ^ 0xFF]))
+    bundle = AssetBundle(output)
+    try:
+        assert bundle.verify() == [key(audio_path)]
+    finally:
+        bundle.close()
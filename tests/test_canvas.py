@@ -0,0 +1,34 @@
+from PySide6.QtGui import QColor, QPixmap
+from PySide6.QtTest import QTest
+
+from canvas import StimulusCanvas
+
+
+def test_painted_fires_once_per_new_pixmap(app):
+    canvas = StimulusCanvas()
+    canvas.resize(200, 200)
+    painted = []
+    canvas.painted.connect(painted.append)
+    canvas.show()
+    assert QTest.qWaitForWindowExposed(canvas)
+    try:
+        pix_map = QPixmap(40, 40)
+        pix_map.fill(QColor("blue"))
+        canvas.set_pixmap(pix_map)
+        canvas.repaint()
+        assert len(painted) == 1
+
+        # Text, feedback and repaints of the same stimulus are not onsets.
+        canvas.set_feedback(QColor("green"))
+        canvas.repaint()
+        canvas.set_text("+")
+        canvas.repaint()
+        assert len(painted) == 1
+
+        canvas.set_pixmap(pix_map)
+        canvas.repaint()
+        assert len(painted) == 2 and painted[1] >= painted[0]
+        content = canvas.content
+        assert (content.width(), content.center()) == (40, canvas.rect().center())
+    finally:
+        canvas.close()
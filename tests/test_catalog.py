@@ -0,0 +1,29 @@
+import os
+
+import analysis
+from catalog import SessionIndex
+
+HEADER = "Turn,Elapse,Result,Step,Onset,Response\n"
+
+
+def write_session(path, rows):
+    with open(path, "w") as f:
+        f.write(HEADER + "".join(",".join(str(value) for value in (i + 1, *row)) + "\n"
+                                 for i, row in enumerate(rows)))
+
+
+def test_index_paths_follow_the_index(tmp_path, monkeypatch):
+    folder = tmp_path / "logs" / "Go-no_go"
+    folder.mkdir(parents=True)
+    write_session(folder / "a.csv", [(300, "correct", "go", 0, 0)])
+    monkeypatch.chdir(tmp_path)
+    index = SessionIndex("logs/sessions.sqlite")
+    index.register({"session": "a", "paradigm": "Go-no_go", "csv_path": "logs/Go-no_go/a.csv"})
+    index.close()
+
+    moved = tmp_path / "copy"
+    os.rename(tmp_path / "logs", moved)
+    monkeypatch.chdir(folder.root)
+    write_session(moved / "Go-no_go" / "b.csv", [(0, "miss", "go", 0, 0)])
+    files = analysis.session_files(str(moved), "Go-no_go")
+    assert files == [str(moved / "Go-no_go" / "a.csv"), str(moved / "Go-no_go" / "b.csv")]
@@ -0,0 +1,68 @@
+import os
+import random
+import time
+
+import numpy as np
+
+import analysis
+import cohort
+
+HEADER = "Turn,Elapse,Result,Step,Onset,Response\n"
+
+
+def write_session(path, rows):
+    with open(path, "w") as f:
+        f.write(HEADER + "".join(",".join(str(value) for value in (i + 1, *row)) + "\n"
+                                 for i, row in enumerate(rows)))
+
+
+def cohort_rows(rng, steps, block_turns):
+    rows = []
+    for step, block_turn in zip(steps, block_turns):
+        for _ in range(rng.randint(1, 3 * block_turn)):
+            result = rng.choice(["correct", "wrong", "miss", "pass"])
+            rows.append((rng.randint(150, 900) if result in ("correct", "wrong") else 0, result, step, 0, 0))
+    return rows
+
+
+def assert_cohort_matches(cache, folder):
+    for paradigm in analysis.PARADIGMS:
+        _, columns = analysis.load_sessions(paradigm, folder, 1)
+        groups, scores = analysis.score(columns)
+        cached_groups, cached_scores = cache.scores(paradigm)
+        assert np.array_equal(groups, cached_groups)
+        for name, values in scores.items():
+            assert np.array_equal(values, cached_scores[name], equal_nan=True), name
+
+
+def test_cohort_cache_tracks_changes(tmp_path, monkeypatch):
+    rng = random.Random(5)
+    folder = str(tmp_path / "logs")
+    for paradigm, (steps, block_turns) in analysis.PARADIGMS.items():
+        os.makedirs(os.path.join(folder, paradigm))
+        for i in range(8):
+            write_session(os.path.join(folder, paradigm, f"s{i}.csv"), cohort_rows(rng, steps, block_turns))
+    path = str(tmp_path / "cohort.sqlite")
+    cache = cohort.CohortCache(path)
+    assert cache.refresh(folder, 1) == {"new": 16, "changed": 0, "touched": 0, "removed": 0, "unchanged": 0}
+    assert_cohort_matches(cache, folder)
+
+    steps, block_turns = analysis.PARADIGMS["Go-no_go"]
+    changed = os.path.join(folder, "Go-no_go", "s0.csv")
+    write_session(changed, cohort_rows(rng, steps, block_turns))
+    os.utime(changed, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+    touched = os.path.join(folder, "Go-no_go", "s1.csv")
+    os.utime(touched, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+    os.remove(os.path.join(folder, "Go-no_go", "s2.csv"))
+    write_session(os.path.join(folder, "Go-no_go", "s8.csv"), cohort_rows(rng, steps, block_turns))
+    assert cache.refresh(folder, 1) == {"new": 1, "changed": 1, "touched": 1, "removed": 1, "unchanged": 13}
+    assert_cohort_matches(cache, folder)
+    assert cache.refresh(folder, 1)["unchanged"] == 16
+    cache.close()
+
+    monkeypatch.setattr(cohort, "VERSION", cohort.VERSION + 1)
+    cache = cohort.CohortCache(path)
+    assert cache.refresh(folder, 1)["new"] == 16
+    assert_cohort_matches(cache, folder)
+    cache.close()
+
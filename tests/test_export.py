@@ -0,0 +1,34 @@
+import numpy as np
+
+from catalog import SessionIndex
+from export import export_session, read_tables
+from summary import Summary
+
+
+def test_exported_tables_read_back(tmp_path):
+    summary = Summary()
+    summary.record_start("go")
+    for row in [(300, "correct", "go", 10, 310), (0, "miss", "go", 20, 0), (450, "wrong", "go", 30, 480)]:
+        summary.restore(*row)
+    index_path = str(tmp_path / "sessions.sqlite")
+    name = "p_2024-01-01-00-00-00_lab_12345678"
+    fields = export_session(str(tmp_path), name, summary, {"paradigm": "Go-no_go", "seed": 7}, index_path)
+
+    read_fields, tables = read_tables(fields["data_path"])
+    # The data path is only known once the tables are written, so the stored metadata goes without it.
+    assert read_fields == {name: value for name, value in fields.items() if name != "data_path"}
+    assert (read_fields["participant"], read_fields["station"], read_fields["trials"]) == ("p", "lab", 3)
+    columns, names = tables["trials"]
+    assert columns["turn"].tolist() == [1, 2, 3]
+    assert [names["outcome"][code] for code in columns["outcome"]] == ["correct", "miss", "wrong"]
+    assert [names["step"][code] for code in columns["step"]] == ["go"] * 3
+    assert columns["rt"].tolist() == [300_000, 0, 450_000]
+    assert columns["response"].dtype == np.int64 and columns["response"].tolist() == [310, 0, 480]
+    events, event_names = tables["events"]
+    assert [event_names["kind"][code] for code in events["kind"]] == ["start"]
+
+    index = SessionIndex(index_path)
+    [session] = index.sessions()
+    index.close()
+    assert (session["session"], session["status"], session["seed"]) == (name, "complete", 7)
+    assert session["data_path"] == fields["data_path"]
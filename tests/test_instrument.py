@@ -0,0 +1,28 @@
+import random
+
+import numpy as np
+
+from instrument import SIGNIFICANT_BITS, Histogram
+
+
+def test_percentiles_are_within_one_bucket():
+    rng = random.Random(8)
+    values = [int(rng.lognormvariate(14, 1.5)) for _ in range(5000)]
+    histogram = Histogram()
+    for value in values:
+        histogram.record(value)
+    assert (histogram.count, histogram.min, histogram.max) == (len(values), min(values), max(values))
+    for percentile in [50, 90, 99, 99.9]:
+        exact = np.percentile(values, percentile, method="inverted_cdf")
+        # A bucket is its values with the low bits cleared, so it reads low by less than one bucket width.
+        bucket = histogram.percentile(percentile)
+        assert bucket <= exact < bucket * (1 + 2 ** (1 - SIGNIFICANT_BITS))
+
+
+def test_small_values_are_exact():
+    histogram = Histogram()
+    for value in [3, 1, 2, -5]:
+        histogram.record(value)
+    assert histogram.buckets == {0: 1, 1: 1, 2: 1, 3: 1}
+    assert histogram.percentile(50) == 1
+    assert Histogram().percentile(50) == 0
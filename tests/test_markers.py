@@ -0,0 +1,34 @@
+import threading
+
+import pytest
+
+from markers import HEADER, MarkerReceiver, MarkerStream, pack, unpack
+
+
+def test_pack_round_trip():
+    packet = pack("stimulus", 7, 123_456_789_012, "字母A.png")
+    assert len(packet) == HEADER.size + len("字母A.png".encode())
+    assert unpack(packet) == ("stimulus", 7, 123_456_789_012, "字母A.png")
+    with pytest.raises(ValueError):
+        unpack(b"XXXX" + packet[4:])
+
+
+def test_udp_markers_arrive_after_a_clock_sync():
+    receiver = MarkerReceiver("udp://127.0.0.1:0")
+    port = receiver.socket.getsockname()[1]
+    thread = threading.Thread(target=receiver.serve, args=(3, False), daemon=True)
+    thread.start()
+    stream = MarkerStream(f"udp://127.0.0.1:{port}")
+    try:
+        for i in range(3):
+            stream.send("stimulus", str(i))
+        thread.join(5)
+    finally:
+        stream.close()
+        receiver.socket.close()
+    assert not thread.is_alive()
+    assert (stream.sent, stream.failed) == (3, 0)
+    # Both ends share one clock here, so the measured offset is at most the best round trip.
+    assert stream.rtt is not None and abs(stream.offset) <= stream.rtt
+    assert receiver.offset == stream.offset
+    assert len(receiver.latencies) == 3 and all(latency > -stream.rtt for latency in receiver.latencies)
@@ -0,0 +1,27 @@
+import random
+
+import pytest
+
+from plan import block_trials, violations
+
+
+def test_violations():
+    rule = {"kind": "set", "targets": ["a"], "max_run": 2}
+    trials = [("a", True), ("a", True), ("a", True), ("b", False)]
+    assert violations(trials, 3, rule) == ["a run of 3 exceeds 2"]
+    assert violations(trials, 2, rule, previous="a") == ["3 targets instead of 2", "a run of 3 exceeds 2",
+                                                         "a repeats across the block boundary"]
+    assert violations(trials[1:], 2, {"kind": "set", "targets": ["a"]}, previous="b") == []
+
+
+def test_block_trials_respects_rule():
+    rule = {"kind": "set", "targets": ["a", "b"], "max_run": 3}
+    for seed in range(20):
+        trials = block_trials(["a", "b", "c", "d"], 24, rule, random.Random(seed), previous="a")
+        assert violations(trials, 12, rule, "a") == []
+
+
+def test_block_trials_gives_up():
+    rule = {"kind": "set", "targets": ["a", "b"], "max_run": 1}
+    with pytest.raises(ValueError, match="no valid set sequence"):
+        block_trials(["a", "b"], 8, rule, random.Random(0))
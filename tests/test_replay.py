@@ -0,0 +1,52 @@
+import os
+import time
+
+import pytest
+
+from catalog import SessionIndex
+from paradigm import Paradigm
+from replay import indexed_paths, replay
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEADER = "Turn,Elapse,Result,Step,Onset,Response\n"
+
+
+def test_recovered_sessions_keep_the_seed_and_are_not_replayed(tmp_path):
+    paradigm = Paradigm(os.path.join(ROOT, "assets", "paradigms", "n_back.json"))
+    paradigm.log_folder = str(tmp_path / paradigm.name)
+    os.makedirs(paradigm.log_folder)
+    name = "p_2024-01-01-00-00-00"
+    with open(os.path.join(paradigm.log_folder, f"{name}.csv.partial"), "w") as f:
+        f.write(HEADER + "1,300,correct,one_back,0,0\n")
+    with open(os.path.join(paradigm.log_folder, f"{name}.txt.partial"), "w") as f:
+        f.write("block start\nseed: 4242\n")
+    assert len(paradigm.recover_logs()) == 1
+
+    index = SessionIndex(paradigm.index_path)
+    [session] = index.sessions()
+    index.close()
+    assert (session["status"], session["seed"]) == ("recovered", 4242)
+    assert os.path.exists(session["data_path"])
+    assert indexed_paths(paradigm.index_path) == []
+
+
+def test_replay_regenerates_the_logged_sequence(app, monkeypatch):
+    # The harness plays the prompts' audio.
+    pytest.importorskip("PySide6.QtMultimedia", exc_type=ImportError)
+    from benchmark import RESPONDERS, Harness
+
+    monkeypatch.chdir(ROOT)
+    harness = Harness(Paradigm(os.path.join("assets", "paradigms", "n_back.json")), RESPONDERS["lapse"], seed=3)
+    harness.run()
+    index_path = harness.paradigm.index_path
+    harness.widget.close()
+    # The session is exported by the writer thread once its files are closed.
+    deadline = time.monotonic() + 10
+    while not os.path.exists(index_path) or not indexed_paths(index_path):
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+    [path] = indexed_paths(index_path)
+    result = replay(path)
+    assert (result["sequence"], result["changed"], result["trials"]) == ("match", 0, 60)
+    assert result["rt_error_max"] < 1
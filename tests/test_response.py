@@ -0,0 +1,73 @@
+import os
+import time
+
+import pytest
+from PySide6.QtCore import Qt
+from PySide6.QtTest import QTest
+from PySide6.QtWidgets import QLineEdit, QPushButton, QVBoxLayout, QWidget
+
+from response import ResponseInput, SerialBox
+
+
+def test_space_in_an_editor_is_text(app):
+    window = QWidget()
+    edit = QLineEdit(window)
+    button = QPushButton(window)
+    layout = QVBoxLayout(window)
+    layout.addWidget(edit)
+    layout.addWidget(button)
+    responses = ResponseInput(window, box=None)
+    pressed = []
+    responses.pressed.connect(lambda press_time, source, bounced: pressed.append(source))
+    clicked = []
+    button.clicked.connect(lambda: clicked.append(True))
+    window.show()
+    window.activateWindow()
+    assert QTest.qWaitForWindowActive(window)
+    try:
+        edit.setFocus()
+        QTest.keyClicks(edit, "one back")
+        assert edit.text() == "one back"
+        assert pressed == []
+
+        button.setFocus()
+        QTest.keyClick(button, Qt.Key.Key_Space)
+        assert pressed == ["key"]
+        assert clicked == []
+    finally:
+        responses.close()
+        window.close()
+
+
+def test_serial_box_reads_a_pty(app):
+    pty = pytest.importorskip("pty")
+    tty = pytest.importorskip("tty")
+    main, secondary = pty.openpty()
+    # A serial device delivers bytes as they come, not a line at a time.
+    tty.setraw(secondary)
+    box = SerialBox(os.ttyname(secondary))
+    received = []
+    box.received.connect(lambda press_time, source: received.append((press_time, source)),
+                         Qt.ConnectionType.DirectConnection)
+    try:
+        # Opening the port flushes input, so keep probing until the reader thread is up.
+        deadline = time.monotonic() + 2
+        while not received and time.monotonic() < deadline:
+            os.write(main, bytes([1]))
+            time.sleep(0.05)
+        received.clear()
+        os.write(main, bytes([2, 3]))
+        while len(received) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        box.stop()
+        os.close(main)
+        os.close(secondary)
+    assert [source for _, source in received] == ["box2", "box3"]
+
+
+def test_serial_box_reports_a_missing_port(app, tmp_path, capsys):
+    box = SerialBox(str(tmp_path / "missing"))
+    box.thread.join(1)
+    assert not box.thread.is_alive()
+    assert "could not open" in capsys.readouterr().err
@@ -0,0 +1,71 @@
+from PySide6.QtWidgets import QWidget
+
+from scheduler import DeadlineScheduler, FrameScheduler
+
+MS = 1_000_000
+
+
+class Clock:
+    def __init__(self):
+        self.time = 0
+
+    def __call__(self):
+        return self.time
+
+
+def test_deadlines_accumulate_from_the_block_start(app):
+    clock = Clock()
+    scheduler = DeadlineScheduler(clock=clock)
+    lateness, fired = [], []
+    scheduler.on_fire = lateness.append
+    scheduler.start()
+    try:
+        scheduler.after(500, lambda: fired.append(clock.time))
+        assert scheduler.timer.interval() == 500
+
+        clock.time = 503 * MS + MS // 5
+        scheduler.timer.timeout.emit()
+        assert fired == [clock.time]
+        assert lateness == [3 * MS + MS // 5]
+
+        # The next deadline is 1000 ms after the start, not 500 ms after the late firing.
+        scheduler.after(500, lambda: fired.append(clock.time))
+        assert scheduler.timer.interval() == 497
+        assert scheduler.mark() == (1000.0, 503.2)
+    finally:
+        scheduler.stop()
+
+
+def test_a_late_deadline_fires_at_once(app):
+    clock = Clock()
+    scheduler = DeadlineScheduler(clock=clock)
+    scheduler.start()
+    clock.time = 900 * MS
+    scheduler.after(500, lambda: None)
+    assert scheduler.timer.interval() == 0
+    scheduler.stop()
+
+
+def test_frames_are_counted_on_the_refresh_grid(app):
+    clock = Clock()
+    widget = QWidget()
+    scheduler = FrameScheduler(widget, clock=clock)
+    scheduler.period = 1e9 / 60
+    fired = []
+    scheduler.start()
+    scheduler.after(50, lambda: fired.append(scheduler.frame))
+    # The widget was never shown, so the fallback timer is running; the test drives tick() itself.
+    scheduler.timer.stop()
+    assert scheduler.deadline == 3
+
+    start = 1000 * MS
+    scheduler.tick(start)
+    # Update requests that arrive faster than the display refreshes do not advance the count.
+    scheduler.tick(start + 0.4 * scheduler.period)
+    assert scheduler.frame == 0
+    scheduler.tick(start + scheduler.period)
+    assert (scheduler.frame, fired) == (1, [])
+    scheduler.tick(start + 4 * scheduler.period)
+    assert fired == [4]
+    assert scheduler.take_frames() == ([(4, start + 4 * scheduler.period)], 2)
+    assert scheduler.take_frames() == ([], 0)
@@ -0,0 +1,74 @@
+import random
+
+import pytest
+
+from plan import block_trials, violations
+from sequence import FILLER, LURE, TARGET, NBackWindow, classify, classify_streams, dual_n_back_sequence, lure_lags, \
+    n_back_sequence, validate
+
+
+def reference_kinds(sequence, back):
+    kinds = []
+    for i, letter in enumerate(sequence):
+        if i >= back and sequence[i - back] == letter:
+            kinds.append(TARGET)
+        elif any(i >= lag and sequence[i - lag] == letter for lag in lure_lags(back)):
+            kinds.append(LURE)
+        else:
+            kinds.append(FILLER)
+    return kinds
+
+
+
+@pytest.mark.parametrize("back", [1, 2, 3])
+def test_window_matches_reference(back):
+    rng = random.Random(back)
+    sequence = [rng.choice("ABCD") for _ in range(500)]
+    assert classify(sequence, back) == reference_kinds(sequence, back)
+
+
+def test_window_forgets_letters_outside_the_ring():
+    window = NBackWindow(2)
+    for letter in "ABCD":
+        window.push(letter)
+    assert window.classify("A") == FILLER
+    assert window.classify("C") == TARGET
+    assert window.classify("D") == LURE
+
+
+@pytest.mark.parametrize("back,lures", [(1, 0), (2, 0), (2, 3), (3, 2)])
+def test_n_back_sequence_has_exact_counts(back, lures):
+    for seed in range(20):
+        sequence = n_back_sequence("ABCDOP", 40, back, 12, lures, random.Random(seed))
+        assert len(sequence) == 40
+        assert validate(sequence, back, 12, lures)
+        assert classify(sequence, back) == reference_kinds(sequence, back)
+
+
+def test_n_back_sequence_rejects_too_few_letters():
+    with pytest.raises(ValueError):
+        n_back_sequence("AB", 20, 2, 5)
+
+
+def test_streams_classify_independently():
+    rng = random.Random(4)
+    trials = [(rng.choice("ABC"), rng.choice("xyz")) for _ in range(200)]
+    kinds = classify_streams(trials, 2)
+    for stream in range(2):
+        assert [kind[stream] for kind in kinds] == classify([trial[stream] for trial in trials], 2)
+
+
+def test_dual_n_back_sequence_has_exact_counts_in_both_streams():
+    trials = dual_n_back_sequence("ABCDOP", ["1.wav", "2.wav", "3.wav", "4.wav"], 30, 2, 9, 0, random.Random(1))
+    for stream in zip(*trials):
+        assert validate(list(stream), 2, 9)
+
+
+@pytest.mark.parametrize("respond", ["visual", "auditory"])
+def test_dual_n_back_rule_marks_the_responded_stream(respond):
+    sounds = ["1.wav", "2.wav", "3.wav", "4.wav"]
+    rule = {"kind": "dual_n_back", "back": 2, "targets": 0.3, "sounds": sounds, "respond": respond, "max_run": 6}
+    trials = block_trials(list("ABCDOP"), 20, rule, random.Random(7))
+    assert violations(trials, 6, rule) == []
+    stream = [trial[0] if respond == "visual" else trial[2] for trial in trials]
+    assert [target for _, target, _ in trials] == [kind == TARGET for kind in classify(stream, 2)]
@@ -0,0 +1,21 @@
+import os
+
+from PySide6.QtGui import QColor, QImage
+
+from stimulus import StimulusCache
+
+
+def test_prescaled_pixmaps_match_any_spelling_of_the_path(app, tmp_path):
+    folder = tmp_path / "images"
+    folder.mkdir()
+    image = QImage(40, 20, QImage.Format.Format_RGB32)
+    image.fill(QColor("red"))
+    image.save(str(folder / "a.png"))
+
+    cache = StimulusCache(bundled=False)
+    paths = cache.load(str(folder))
+    cache.rescale(paths, 100, 50, 1.0)
+    # set_image joins the block folder itself, which need not match the spelling load() returned.
+    pix_map = cache.pixmap(os.path.join(str(folder), ".", "a.png"), 100, 50, 1.0)
+    assert (cache.hit_count, cache.miss_count) == (1, 0)
+    assert pix_map.width() == 100
@@ -0,0 +1,22 @@
+import random
+import statistics
+
+import pytest
+
+from summary import Summary
+
+
+def test_summary_rt_statistics():
+    rng = random.Random(3)
+    summary = Summary()
+    rts = []
+    for _ in range(200):
+        result = rng.choice(["correct", "wrong", "miss", "pass"])
+        elapse = rng.randint(150, 900) if result in ("correct", "wrong") else 0
+        summary.restore(elapse, result, "go")
+        if elapse:
+            rts.append(elapse)
+    assert summary.rt_count == len(rts)
+    assert summary.rt_mean == pytest.approx(statistics.fmean(rts))
+    assert summary.rt_variance == pytest.approx(statistics.variance(rts))
+    assert summary.total == 200
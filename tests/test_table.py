@@ -0,0 +1,53 @@
+import random
+
+from PySide6.QtCore import Qt
+from PySide6.QtTest import QTest
+
+from summary import TrialStore
+from table import FILTER_DELAY, RecordModel, RecordTable
+
+HEADERS = ["Turn", "Elapse", "Result", "Step", "Onset", "Response"]
+
+
+def random_store(rng, count):
+    store = TrialStore()
+    for _ in range(count):
+        store.append(rng.randrange(4), rng.randint(0, 900_000), "A.png", rng.choice(["one_back", "two_back"]), 0, 0,
+                     rng.getrandbits(20), rng.getrandbits(20))
+    return store
+
+
+def test_record_model_keeps_sort_on_insert(app):
+    model = RecordModel(HEADERS)
+    store = TrialStore()
+    model.set_records(store)
+    model.sort(1, Qt.SortOrder.DescendingOrder)
+    changed = []
+    model.dataChanged.connect(lambda first, last: changed.append((first.row(), last.row())))
+    rng = random.Random(2)
+    for _ in range(50):
+        store.append(2, 0, "A.png", "one_back", 0, 0)
+        model.refresh()
+        store.outcome[-1], store.rt[-1] = 0, rng.randint(100, 900) * 1000
+        model.refresh()
+        assert model.rows == model.arrange()
+    assert all(first == last for first, last in changed)
+
+
+def test_typed_filter_matches_every_displayed_cell(app):
+    store = random_store(random.Random(6), 500)
+    model = RecordModel(HEADERS)
+    model.set_records(store)
+    for pattern in ["miss", "o", "two", "_b", "12", "3", "x"]:
+        model.filter(pattern)
+        assert model.rows == [i for i in range(len(store))
+                              if any(pattern in str(value) for value in (i + 1, *store[i]))], pattern
+
+
+def test_filter_waits_for_typing_to_pause(app):
+    table = RecordTable(HEADERS)
+    table.record_model.set_records(random_store(random.Random(1), 100))
+    QTest.keyClicks(table.filter_edit, "miss")
+    assert len(table.record_model.rows) == 100
+    QTest.qWait(FILTER_DELAY * 2)
+    assert table.record_model.rows == [i for i in range(100) if table.record_model.records[i][1] == "miss"]
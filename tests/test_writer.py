@@ -0,0 +1,49 @@
+import os
+
+from writer import recover, session_id, session_participant, session_station
+
+HEADER = "Turn,Elapse,Result,Step,Onset,Response\n"
+
+
+def test_recover_keeps_partials_until_finish_succeeds(tmp_path):
+    partial = tmp_path / "a.csv.partial"
+    partial.write_text(HEADER + "1,300,correct,go,0,0\n2,0,miss,go,0,0\n3,4")
+    (tmp_path / "a.txt.partial").write_text("log\n")
+
+    def fail(folder, name, rows):
+        raise RuntimeError("index locked")
+
+    assert recover(str(tmp_path), fail) == []
+    assert sorted(os.listdir(tmp_path)) == ["a.csv.partial", "a.txt.partial"]
+
+    finished = []
+
+    def finish(folder, name, rows):
+        finished.append(rows)
+        return "footer\n"
+
+    assert recover(str(tmp_path), finish) == [str(tmp_path / "a.recovered.csv")]
+    assert finished == [[["1", "300", "correct", "go", "0", "0"], ["2", "0", "miss", "go", "0", "0"]]]
+    assert sorted(os.listdir(tmp_path)) == ["a.recovered.csv", "a.recovered.txt"]
+    assert (tmp_path / "a.recovered.csv").read_text() == HEADER + "1,300,correct,go,0,0\n2,0,miss,go,0,0\n"
+    assert (tmp_path / "a.recovered.txt").read_text() == "log\nfooter\n"
+
+
+def test_recover_skips_other_stations(tmp_path):
+    name = "p_2024-01-01-00-00-00_other_12345678"
+    (tmp_path / f"{name}.csv.partial").write_text(HEADER)
+    assert recover(str(tmp_path), lambda folder, name, rows: "", station="here") == []
+    assert os.listdir(tmp_path) == [f"{name}.csv.partial"]
+
+
+def test_session_ids_carry_participant_and_station():
+    name = session_id("Li Ming_01", "lab-2")
+    assert name.startswith("Li-Ming-01_") and len(name.split("_")) == 4
+    assert (session_participant(name), session_station(name)) == ("Li-Ming-01", "lab-2")
+    assert session_id(None, "lab-2").startswith("anonymous_")
+    assert session_id("p", "lab-2") != session_id("p", "lab-2")
+
+
+def test_names_from_before_stations_have_none():
+    for name in ["2024-01-01-00-00-00", "p_2024-01-01-00-00-00"]:
+        assert (session_participant(name), session_station(name)) == (None, None)
@@ -0,0 +1,7 @@
+import time
+
+clock = time.perf_counter_ns
+
+
+def now():
+    return clock()
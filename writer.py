@@ -0,0 +1,143 @@
+import datetime
+import os
+import queue
+import re
+import socket
+import sys
+import threading
+import uuid
+
+PARTIAL_SUFFIX = ".partial"
+RECOVERED_SUFFIX = ".recovered"
+ANONYMOUS = "anonymous"
+
+
+def clean(name):
+    return re.sub(r"[\W_]+", "-", name).strip("-")
+
+
+STATION = clean(os.environ.get("PARADIGM_STATION") or socket.gethostname()) or "station"
+
+
+def session_id(participant=None, station=STATION):
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
+    return f"{clean(participant or '') or ANONYMOUS}_{timestamp}_{station}_{uuid.uuid4().hex[:8]}"
+
+
+def session_station(name):
+    parts = name.split("_")
+    return parts[2] if len(parts) == 4 else None
+
+
+def session_participant(name):
+    parts = name.split("_")
+    return parts[0] if len(parts) == 4 else None
+
+
+class TrialWriter:
+    def __init__(self, folder, headers, name=None):
+        self.folder = folder
+        self.name = name or session_id()
+        self.paths = {ext: os.path.join(folder, f"{self.name}.{ext}") for ext in ("csv", "txt")}
+        self.files = {}
+
+        self.queue = queue.SimpleQueue()
+        self.queue.put(("csv", f"{','.join(headers)}\n"))
+        self.thread = threading.Thread(target=self.run, name=f"writer-{self.name}", daemon=True)
+        self.thread.start()
+
+    def write_row(self, row):
+        self.queue.put(("csv", ",".join(str(e) for e in row) + "\n"))
+
+    def write_line(self, line):
+        self.queue.put(("txt", line + "\n"))
+
+    def sync(self):
+        self.queue.put(("sync", None))
+
+    def close(self, footer="", finish=None):
+        self.queue.put(("close", (footer, finish)))
+
+    def abandon(self):
+        self.queue.put(("abandon", None))
+
+    def join(self, timeout=None):
+        self.thread.join(timeout)
+
+    def run(self):
+        os.makedirs(self.folder, exist_ok=True)
+        self.files = {ext: open(path + PARTIAL_SUFFIX, "x") for ext, path in self.paths.items()}
+        while True:
+            kind, line = self.queue.get()
+            if kind in self.files:
+                self.files[kind].write(line)
+            elif kind == "sync":
+                for f in self.files.values():
+                    f.flush()
+                    os.fsync(f.fileno())
+            else:
+                footer, finish = line or ("", None)
+                if kind == "close":
+                    self.files["txt"].write(footer)
+                for ext, f in self.files.items():
+                    f.flush()
+                    os.fsync(f.fileno())
+                    f.close()
+                    if kind == "close":
+                        os.replace(self.paths[ext] + PARTIAL_SUFFIX, self.paths[ext])
+                if finish:
+                    finish(self.folder, self.name)
+                return
+
+
+def read_rows(path):
+    rows = []
+    with open(path) as f:
+        next(f, None)
+        for line in f:
+            if not line.endswith("\n"):
+                break
+            row = line.rstrip("\n").split(",")
+            if not row[0].isdigit():
+                break
+            rows.append(row)
+    return rows
+
+
+def recover(folder, finish, station=STATION):
+    recovered = []
+    if not os.path.exists(folder):
+        return recovered
+    for file in os.listdir(folder):
+        if not file.endswith(".csv" + PARTIAL_SUFFIX):
+            continue
+        path = os.path.join(folder, file)
+        name = file[:-len(".csv" + PARTIAL_SUFFIX)]
+        # Another station sharing the folder may still be writing this session.
+        if session_station(name) not in (None, station):
+            continue
+        txt_path = os.path.join(folder, f"{name}.txt" + PARTIAL_SUFFIX)
+        csv_path = os.path.join(folder, f"{name}{RECOVERED_SUFFIX}.csv")
+        try:
+            rows = read_rows(path)
+            with open(path) as f:
+                header = f.readline()
+            # Both partial files stay until everything derived from them exists, so a failure is retried next launch.
+            footer = finish(folder, name, rows)
+            with open(csv_path, "w") as f:
+                f.write(header)
+                f.write("".join(",".join(row) + "\n" for row in rows))
+            lines = ""
+            if os.path.exists(txt_path):
+                with open(txt_path) as f:
+                    lines = f.read()
+            with open(os.path.join(folder, f"{name}{RECOVERED_SUFFIX}.txt"), "w") as f:
+                f.write(lines + footer)
+            os.remove(path)
+            if os.path.exists(txt_path):
+                os.remove(txt_path)
+        except Exception as e:
+            print(f"could not recover {path}: {e}", file=sys.stderr)
+            continue
+        recovered.append(csv_path)
+    return recovered